@@ -0,0 +1,266 @@
+import datetime
+import glob
+import json
+import os
+import threading
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+import PyPDF2
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfbase import pdfmetrics
+
+
+class LayoutError(ValueError):
+    """Raised when a template layout file is missing data or points at missing files."""
+
+
+@dataclass(frozen=True)
+class Position:
+    page: int
+    x: float
+    y: float
+
+
+@dataclass(frozen=True)
+class Field:
+    """Text taken from the request (or a computed value) drawn on one or more lines."""
+    name: str
+    lines: Tuple[Position, ...]
+    wrap_width: Optional[float] = None
+    value: Optional[str] = None
+    format: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Choice:
+    """A mark drawn at the position of the option selected in the request."""
+    name: str
+    mark: str
+    options: Dict[str, Position]
+
+
+class TemplateLayout:
+    """A declaration template with its parsed PDF, font and field positions.
+
+    Loaded and validated once; ``build_texts`` only resolves request values.
+    Static elements of the layout are merged into the cached template pages
+    at load time, so requests draw variable text only.
+    """
+
+    def __init__(self, name, template_path, output_filename, font_name, font_size, fields, choices, static):
+        self.name = name
+        self.template_path = template_path
+        self.output_filename = output_filename
+        self.font_name = font_name
+        self.font_size = font_size
+        self.fields = fields
+        self.choices = choices
+        self.static = static
+
+        self._pages_lock = threading.Lock()
+        self._pages = PyPDF2.PdfReader(BytesIO(self._load_template())).pages
+        # Resolve every object the pages use, so requests never read the template stream
+        self.add_pages_to(PyPDF2.PdfWriter(), {})
+
+    def build_texts(self, data):
+        """Return the texts and their ``[x, y, page]`` coordinates for one request."""
+        texts = []
+        coordinates = []
+
+        for field in self.fields:
+            if field.value == "today":
+                value = datetime.datetime.now().strftime(field.format or "%d.%m.%Y")
+            else:
+                value = str(data.get(field.name) or "")
+
+            lines = wrap_text(value, field.wrap_width, len(field.lines), self.font_name, self.font_size)
+            for line, position in zip(lines, field.lines):
+                texts.append(line)
+                coordinates.append([position.x, position.y, position.page])
+
+        for choice in self.choices:
+            position = choice.options.get(str(data.get(choice.name) or "").lower())
+            if position:
+                texts.append(choice.mark)
+                coordinates.append([position.x, position.y, position.page])
+
+        return texts, coordinates
+
+    def add_pages_to(self, writer, overlays):
+        """Add the template pages to ``writer`` with ``overlays[page_index]`` merged in.
+
+        Overlays are merged into private copies of the cached pages before
+        the writer takes them: PyPDF2 3.0 writes the merged content of a page
+        the writer already owns as a direct stream, which PDF viewers refuse
+        to load. Merging only replaces the copy's contents, resources and
+        annotations, so the cached pages are never modified.
+        """
+        with self._pages_lock:
+            for page_index, page in enumerate(self._pages):
+                overlay = overlays.get(page_index)
+                if overlay is not None:
+                    page_copy = PyPDF2.PageObject(page.pdf)
+                    page_copy.update(page)
+                    page_copy.merge_page(overlay)
+                    page = page_copy
+                writer.add_page(page)
+
+    def _load_template(self):
+        with open(self.template_path, "rb") as infile:
+            template_bytes = infile.read()
+        reader = PyPDF2.PdfReader(BytesIO(template_bytes))
+
+        positions = [position for field in self.fields for position in field.lines]
+        positions += [position for choice in self.choices for position in choice.options.values()]
+        positions += [position for _, position in self.static]
+        for position in positions:
+            if not 0 <= position.page < len(reader.pages):
+                raise LayoutError(
+                    f"Layout '{self.name}' uses page {position.page}, "
+                    f"but {self.template_path} has {len(reader.pages)} pages"
+                )
+
+        if self.static:
+            template_bytes = self._render_static(reader)
+        return template_bytes
+
+    def _render_static(self, reader):
+        writer = PyPDF2.PdfWriter()
+        for page_index, page in enumerate(reader.pages):
+            elements = [(text, position) for text, position in self.static if position.page == page_index]
+            if elements:
+                packet = BytesIO()
+                c = canvas.Canvas(packet, pagesize=letter)
+                c.setFont(self.font_name, self.font_size)
+                for text, position in elements:
+                    c.drawString(position.x, position.y, text)
+                c.save()
+                packet.seek(0)
+                page.merge_page(PyPDF2.PdfReader(packet).pages[0])
+            writer.add_page(page)
+
+        output = BytesIO()
+        writer.write(output)
+        return output.getvalue()
+
+
+def wrap_text(text, width, max_lines, font_name, font_size):
+    """Split ``text`` into at most ``max_lines`` lines no wider than ``width`` points.
+
+    Words are kept whole where possible; the last line takes whatever is
+    left, as there is nowhere else to put it.
+    """
+    if max_lines <= 1 or width is None or pdfmetrics.stringWidth(text, font_name, font_size) <= width:
+        return [text]
+
+    lines = []
+    remaining = text
+    while remaining and len(lines) < max_lines - 1:
+        if pdfmetrics.stringWidth(remaining, font_name, font_size) <= width:
+            break
+
+        end = len(remaining)
+        while end > 1 and pdfmetrics.stringWidth(remaining[:end], font_name, font_size) > width:
+            end -= 1
+
+        # Break at the last space that fits, or mid-word when a single word is too wide
+        last_space = remaining[:end + 1].rfind(" ")
+        if last_space > 0:
+            lines.append(remaining[:last_space])
+            remaining = remaining[last_space + 1:]
+        else:
+            lines.append(remaining[:end])
+            remaining = remaining[end:]
+
+    lines.append(remaining)
+    return lines
+
+
+def register_font(font_name, font_path):
+    if font_name in pdfmetrics.getRegisteredFontNames():
+        return
+    if not os.path.exists(font_path):
+        raise FileNotFoundError(f"Font file not found at: {font_path}")
+    pdfmetrics.registerFont(TTFont(font_name, font_path))
+
+
+def _position(spec, where):
+    try:
+        return Position(int(spec["page"]), float(spec["x"]), float(spec["y"]))
+    except (KeyError, TypeError, ValueError):
+        raise LayoutError(f"{where} needs numeric 'page', 'x' and 'y'")
+
+
+def load_layout(path, base_dir):
+    with open(path, "r", encoding="utf-8") as layout_file:
+        try:
+            spec = json.load(layout_file)
+        except ValueError as e:
+            raise LayoutError(f"{path} is not valid JSON: {e}")
+
+    missing = [key for key in ("name", "template", "font", "fields") if key not in spec]
+    if missing:
+        raise LayoutError(f"{path} is missing: {', '.join(missing)}")
+
+    name = spec["name"]
+    font = spec["font"]
+    font_name = font.get("name", "Arial")
+    font_size = float(font.get("size", 12))
+    register_font(font_name, os.path.join(base_dir, font["path"]))
+
+    fields: List[Field] = []
+    for field_spec in spec["fields"]:
+        field_name = field_spec.get("name")
+        if not field_name:
+            raise LayoutError(f"Every field in {path} needs a 'name'")
+        where = f"Field '{field_name}' in {path}"
+        lines = field_spec.get("lines") or [field_spec]
+        fields.append(Field(
+            name=field_name,
+            lines=tuple(_position(line, where) for line in lines),
+            wrap_width=field_spec.get("wrapWidth"),
+            value=field_spec.get("value"),
+            format=field_spec.get("format"),
+        ))
+
+    choices: List[Choice] = []
+    for choice_spec in spec.get("choices", []):
+        where = f"Choice '{choice_spec.get('name')}' in {path}"
+        if not choice_spec.get("name") or not choice_spec.get("options"):
+            raise LayoutError(f"{where} needs a 'name' and 'options'")
+        choices.append(Choice(
+            name=choice_spec["name"],
+            mark=choice_spec.get("mark", "X"),
+            options={option.lower(): _position(position, where) for option, position in choice_spec["options"].items()},
+        ))
+
+    static = [(element["text"], _position(element, f"Static text in {path}")) for element in spec.get("static", [])]
+
+    return TemplateLayout(
+        name=name,
+        template_path=os.path.join(base_dir, spec["template"]),
+        output_filename=spec.get("outputFilename", f"{name}_filled.pdf"),
+        font_name=font_name,
+        font_size=font_size,
+        fields=fields,
+        choices=choices,
+        static=static,
+    )
+
+
+def load_layouts(layouts_dir, base_dir):
+    """Load every ``*.json`` layout in ``layouts_dir``, keyed by layout name."""
+    layouts = {}
+    for path in sorted(glob.glob(os.path.join(layouts_dir, "*.json"))):
+        layout = load_layout(path, base_dir)
+        if layout.name in layouts:
+            raise LayoutError(f"Duplicate layout name '{layout.name}' in {path}")
+        layouts[layout.name] = layout
+
+    if not layouts:
+        raise LayoutError(f"No template layouts found in {layouts_dir}")
+    return layouts
@@ -1,16 +1,24 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 import requests
 import PyPDF2
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase import pdfmetrics
 from io import BytesIO
 import os
-import datetime
+import re
+import threading
 import time
+import uuid
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dotenv import load_dotenv
+from token_provider import TokenProvider
+from send_queue import SendQueue, QueueFull
+from layout_registry import LayoutError, load_layouts
+from metrics import metrics
 
 load_dotenv()
 app = Flask(__name__)
@@ -21,34 +29,57 @@ LOGIN_URL = os.getenv("LOGIN_URL")
 USERNAME = os.getenv("USERNAME")
 PASSWORD = os.getenv("PASSWORD")
 CC_EMAIL = os.getenv("USER_EMAIL")
-FONT_PATH = os.path.join(os.path.dirname(__file__), "fonts", "Arial.ttf")
-INPUT_PDF_PATH = "Deklaracia.pdf"
-OUTPUT_PDF_PATH = "filled_documents/Deklaracia_filled.pdf"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LAYOUTS_DIR = os.getenv("LAYOUTS_DIR", os.path.join(BASE_DIR, "layouts"))
+DEFAULT_TEMPLATE = os.getenv("DEFAULT_TEMPLATE", "deklaracia")
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "filled_documents")
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+ARCHIVE_FILLED_DOCUMENTS = os.getenv("ARCHIVE_FILLED_DOCUMENTS", "").strip().lower() in ("1", "true", "yes")
+BATCH_RENDER_WORKERS = int(os.getenv("BATCH_RENDER_WORKERS", 0)) or os.cpu_count() or 1
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 200))
+BATCH_BUNDLES = ("none", "pdf", "zip")
 
-def authenticate():
-    payload = {
-        "usernameOrEmail": CC_EMAIL,
-        "Password": PASSWORD
-    }
+_render_pool = None
+_render_pool_lock = threading.Lock()
 
-    print(payload)
+# Template layouts are loaded once per worker process and only read afterwards
+_layouts = None
+_layouts_lock = threading.Lock()
 
-    for attempt in range(5):
-        try:
-            response = requests.post(LOGIN_URL, json=payload)
-            response.raise_for_status()
-            token = response.json().get("token")
-            if token:
-                return token
-            raise ValueError("Authentication failed: No token returned.")
-        except requests.RequestException as e:
-            print(f"Authentication failed ({attempt + 1}/5): {e}")
-            time.sleep(5)
 
-    raise RuntimeError("Authentication failed after multiple attempts.")
+def get_layout(name=None):
+    """Return the layout registered as ``name``; raises KeyError for unknown templates."""
+    if name is not None and not isinstance(name, str):
+        raise KeyError(name)
+
+    global _layouts
+    with _layouts_lock:
+        if _layouts is None:
+            _layouts = load_layouts(LAYOUTS_DIR, BASE_DIR)
+    return _layouts[name or DEFAULT_TEMPLATE]
+
+# One cached token per worker process, shared by all request threads
+token_provider = TokenProvider(LOGIN_URL, CC_EMAIL, PASSWORD)
+
+
+# One keep-alive session per sending thread; sessions are not safe to share between threads
+_sessions = threading.local()
+
+
+def authenticate():
+    return token_provider.get_token()
+
 
-def send_document(email: str, file_path: str):
-    token = authenticate()
+def get_session():
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    return session
+
+def send_document(email: str, document: BytesIO, filename: str):
+    with metrics.stage("auth"):
+        token = authenticate()
+    http = get_session()
 
     payload = {
         "ToEmail": email,
@@ -61,43 +92,133 @@ def send_document(email: str, file_path: str):
         "Authorization": f"Bearer {token}"
     }
 
-    with open(file_path, "rb") as pdf_file:
-        files = {
-            "Document": (os.path.basename(file_path), pdf_file, "application/pdf")
-        }
-        return requests.post(SEND_DOCUMENT_URL, data=payload, files=files, headers=headers)
+    document.seek(0)
+    files = {
+        "Document": (filename, document, "application/pdf")
+    }
+    with metrics.stage("send"):
+        response = http.post(SEND_DOCUMENT_URL, data=payload, files=files, headers=headers)
+
+    if response.status_code == 401:
+        # The cached token was rejected before its expiry, log in again once
+        token_provider.invalidate(token)
+        with metrics.stage("auth"):
+            headers["Authorization"] = f"Bearer {authenticate()}"
+        document.seek(0)
+        with metrics.stage("send"):
+            response = http.post(SEND_DOCUMENT_URL, data=payload, files=files, headers=headers)
+
+    return response
+
+
+def archive_document(document: BytesIO, request_id: str, filename: str):
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    name, extension = os.path.splitext(filename)
+    archive_path = os.path.join(ARCHIVE_DIR, f"{name}_{request_id}{extension}")
+    with open(archive_path, "wb") as archive_file:
+        archive_file.write(document.getbuffer())
+    return archive_path
+
+send_queue = SendQueue(send_document)
+
+def add_text_to_pdf(layout, texts, coordinates):
+    # Group the texts by page, pages without any text are left alone
+    texts_by_page = {}
+    for text, (x, y, page_index) in zip(texts, coordinates):
+        if text:
+            texts_by_page.setdefault(page_index, []).append((x, y, text))
+    overlay_pages = sorted(texts_by_page)
+
+    # One overlay document with a page for every page that carries text
+    packet = BytesIO()
+    c = canvas.Canvas(packet, pagesize=letter)
+    for page_index in overlay_pages:
+        c.setFont(layout.font_name, layout.font_size)
+        for x, y, text in texts_by_page[page_index]:
+            c.drawString(x, y, text)
+        c.showPage()
+    c.save()
+    packet.seek(0)
+    overlays = dict(zip(overlay_pages, PyPDF2.PdfReader(packet).pages)) if overlay_pages else {}
+
+    writer = PyPDF2.PdfWriter()
+    layout.add_pages_to(writer, overlays)
+
+    output = BytesIO()
+    writer.write(output)
+    output.seek(0)
+    return output
+
+def render_declaration(data):
+    layout = get_layout(data.get("template"))
+    return add_text_to_pdf(layout, *layout.build_texts(data)).getvalue()
+
+
+def get_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            # Spawned, not forked: the serving process already runs send threads holding locks
+            _render_pool = ProcessPoolExecutor(
+                max_workers=BATCH_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _render_pool
+
+
+def reset_render_pool(pool):
+    """Drop a broken render pool, so the next batch starts a fresh one."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False)
+
+
+def bundle_pdf(documents):
+    writer = PyPDF2.PdfWriter()
+    for document in documents:
+        for page in PyPDF2.PdfReader(BytesIO(document)).pages:
+            writer.add_page(page)
+
+    output = BytesIO()
+    writer.write(output)
+    output.seek(0)
+    return output
 
-def add_text_to_pdf(input_pdf, output_pdf, texts, coordinates, font_size=12, font_path=None):
-    if not os.path.exists(font_path):
-        raise FileNotFoundError(f"Font file not found at: {font_path}")
 
-    with open(input_pdf, "rb") as infile:
-        reader = PyPDF2.PdfReader(infile)
-        writer = PyPDF2.PdfWriter()
+def bundle_zip(documents, filenames):
+    output = BytesIO()
+    # PDFs are already compressed, storing them keeps the bundle fast to build
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) as archive:
+        for document, filename in zip(documents, filenames):
+            archive.writestr(filename, document)
+    output.seek(0)
+    return output
 
-        packets = [BytesIO() for _ in range(len(reader.pages))]
 
-        # Create a separate overlay for each page
-        for page_index, packet in enumerate(packets):
-            c = canvas.Canvas(packet, pagesize=letter)
-            pdfmetrics.registerFont(TTFont("Arial", font_path))
-            c.setFont("Arial", font_size)
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
 
-            for text, (x, y, page) in zip(texts, coordinates):
-                if page == page_index:
-                    c.drawString(x, y, text)
 
-            c.save()
-            packet.seek(0)
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    started = g.get("request_started")
+    if started is not None:
+        metrics.observe("http_request_duration_seconds", time.perf_counter() - started,
+                        method=request.method, route=route)
+    metrics.inc("http_requests_total", method=request.method, route=route, status=response.status_code)
+    return response
 
-        # Merge overlays with the respective pages
-        for i, page in enumerate(reader.pages):
-            overlay_pdf = PyPDF2.PdfReader(packets[i])
-            page.merge_page(overlay_pdf.pages[0])
-            writer.add_page(page)
 
-        with open(output_pdf, "wb") as output_file:
-            writer.write(output_file)
+def get_request_id():
+    # The request ID names the archived file, so only plain identifiers are taken from the client
+    request_id = request.headers.get("X-Request-ID", "")
+    if not REQUEST_ID_PATTERN.fullmatch(request_id):
+        request_id = uuid.uuid4().hex
+    return request_id
 
 @app.route("/fill_pdf", methods=["POST"])
 def fill_pdf():
@@ -107,68 +228,115 @@ def fill_pdf():
     if not email:
         return jsonify({"error": "Email is required"}), 400
 
-    parent_name = data.get("parentName", "")
-    address = data.get("address", "")
-    telephone = data.get("telephone", "")
-    student_name = data.get("studentName", "")
-    grade = data.get("grade", "")
-    school = data.get("school", "")
-    gender = data.get("gender", "").lower()
-
-    max_length = 32
-    if len(school) > max_length:
-        last_space = school[:max_length].rfind(" ")
-        first_line = school[:last_space] if last_space != -1 else school[:max_length]
-        second_line = school[last_space + 1:] if last_space != -1 else school[max_length:]
-    else:
-        first_line = school
-        second_line = ""
-
-    texts = [
-        parent_name,
-        address,
-        telephone,
-        student_name,
-        grade,
-        first_line,
-        second_line,
-        datetime.datetime.now().strftime('%d.%m.%Y'),
-    ]
-
-    # Coordinates for text placement
-    coordinates = [
-        [210, 615, 0],  # Parent name
-        [150, 575, 0],  # Address
-        [130, 545, 0],  # Telephone
-        [90, 520, 0],   # Student name
-        [250, 475, 0],  # Grade
-        [340, 475, 0],  # School first line
-        [75, 445, 0],   # School second line
-        [375, 232, 1]   # Date (2nd page)
-    ]
-
-    gender_coordinates = {
-        "male": [170, 615, 0],
-        "female": [155, 615, 0]
-    }
-    if gender in gender_coordinates:
-        coordinates.append(gender_coordinates[gender])
-        texts.append("X")
+    request_id = get_request_id()
 
-    input_pdf = "Deklaracia.pdf"
-    output_pdf = "filled_documents/Deklaracia_filled.pdf"
+    try:
+        layout = get_layout(data.get("template"))
+    except KeyError:
+        return jsonify({"error": f"Unknown template: {data.get('template')}"}), 400
+    except (LayoutError, FileNotFoundError) as e:
+        return jsonify({"error": f"Template layouts could not be loaded: {e}"}), 500
+
+    try:
+        with metrics.stage("render", template=layout.name):
+            document = add_text_to_pdf(layout, *layout.build_texts(data))
 
-    font_path = os.path.join(os.path.dirname(__file__), "fonts", "Arial.ttf")
+        if ARCHIVE_FILLED_DOCUMENTS:
+            archive_document(document, request_id, layout.output_filename)
+
+        # The email POST runs on the send queue, the worker is released right away
+        job = send_queue.submit(uuid.uuid4().hex, email=email, document=document, filename=layout.output_filename)
+
+        return jsonify({"message": "PDF filled and queued for sending", "requestId": request_id, **job}), 202
+
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "30"}
+    except FileNotFoundError as e:
+        return jsonify({"error": f"File not found: {e}"}), 404
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+
+
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/fill_pdf/batch", methods=["POST"])
+def fill_pdf_batch():
+    data = request.json
+
+    students = data.get("students")
+    if not isinstance(students, list) or not students:
+        return jsonify({"error": "A non-empty list of students is required"}), 400
+    if len(students) > BATCH_MAX_SIZE:
+        return jsonify({"error": f"At most {BATCH_MAX_SIZE} students can be filled in one batch"}), 400
+    if not all(isinstance(student, dict) for student in students):
+        return jsonify({"error": "Every student must be an object"}), 400
+
+    bundle = data.get("bundle") or "none"
+    if not isinstance(bundle, str) or bundle.lower() not in BATCH_BUNDLES:
+        return jsonify({"error": f"Bundle must be one of: {', '.join(BATCH_BUNDLES)}"}), 400
+    bundle = bundle.lower()
+
+    email = data.get("email")
+    if bundle != "none" and not email:
+        return jsonify({"error": "Email is required for a bundled batch"}), 400
+    if bundle == "none" and not all(student.get("email") or email for student in students):
+        return jsonify({"error": "Email is required for every student"}), 400
+    if bundle == "none" and send_queue.capacity is not None and len(students) > send_queue.capacity:
+        return jsonify({"error": f"At most {send_queue.capacity} documents can be sent separately, "
+                                 f"use a pdf or zip bundle for larger batches"}), 400
 
     try:
-        add_text_to_pdf(input_pdf, output_pdf, texts, coordinates, font_path=font_path)
+        layout = get_layout(data.get("template"))
+    except KeyError:
+        return jsonify({"error": f"Unknown template: {data.get('template')}"}), 400
+    except (LayoutError, FileNotFoundError) as e:
+        return jsonify({"error": f"Template layouts could not be loaded: {e}"}), 500
 
-        response = send_document(email, output_pdf)
+    request_id = get_request_id()
+    name, extension = os.path.splitext(layout.output_filename)
+    filenames = [f"{name}_{index + 1}{extension}" for index in range(len(students))]
 
-        if response.status_code == 200:
-            return jsonify({"message": "PDF filled and sent successfully"})
+    try:
+        records = [{**student, "template": layout.name} for student in students]
+        pool = get_render_pool()
+        try:
+            with metrics.stage("render_batch", template=layout.name):
+                documents = list(pool.map(render_declaration, records))
+        except BrokenProcessPool as e:
+            # A worker that died (e.g. killed for memory) breaks the whole pool, not only this batch
+            reset_render_pool(pool)
+            return jsonify({"error": f"Rendering failed, retry the batch: {e}", "requestId": request_id}), 503, {"Retry-After": "5"}
+        metrics.inc("batch_documents_rendered_total", len(documents), template=layout.name)
+
+        if bundle == "pdf":
+            sends = [(email, bundle_pdf(documents), layout.output_filename)]
+        elif bundle == "zip":
+            sends = [(email, bundle_zip(documents, filenames), f"{name}.zip")]
         else:
-            return jsonify({"error": f"Failed to send document: {response.text}"}), response.status_code
+            sends = [
+                (student.get("email") or email, BytesIO(document), filename)
+                for student, document, filename in zip(students, documents, filenames)
+            ]
+
+        if ARCHIVE_FILLED_DOCUMENTS:
+            for _, document, filename in sends:
+                archive_document(document, request_id, filename)
+
+        # All or nothing, so a client retrying after 503 does not email anyone twice
+        try:
+            jobs = send_queue.submit_many([
+                (uuid.uuid4().hex, {"email": recipient, "document": document, "filename": filename})
+                for recipient, document, filename in sends
+            ])
+        except QueueFull as e:
+            return jsonify({"error": str(e), "requestId": request_id}), 503, {"Retry-After": "30"}
+
+        return jsonify({
+            "message": f"{len(documents)} PDFs filled and queued for sending",
+            "requestId": request_id,
+            "jobs": jobs,
+        }), 202
 
     except FileNotFoundError as e:
         return jsonify({"error": f"File not found: {e}"}), 404
@@ -176,10 +344,25 @@ def fill_pdf():
         import traceback
         traceback.print_exc()
 
-
         return jsonify({"error": str(e)}), 500
 
+@app.route("/fill_pdf/<job_id>", methods=["GET"])
+def fill_pdf_status(job_id):
+    job = send_queue.status(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return app.response_class(metrics.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+try:
+    get_layout()
+except (LayoutError, FileNotFoundError, KeyError) as e:
+    print(f"Template layouts not preloaded: {e}")
+
 if __name__ == "__main__":
-    os.makedirs("filled_documents", exist_ok=True)
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
     os.makedirs("fonts", exist_ok=True)
     app.run(debug=True)
@@ -0,0 +1,137 @@
+import os
+import queue
+import threading
+import time
+import requests
+
+from token_provider import backoff_delay
+from metrics import metrics
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_BASE = 2.0
+DEFAULT_BACKOFF_MAX = 60.0
+DEFAULT_JOB_TTL = 3600
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class QueueFull(Exception):
+    """Raised when the send queue already holds its maximum number of jobs."""
+
+
+class SendQueue:
+    """Bounded background queue for sending filled documents.
+
+    ``send(**job_kwargs)`` must return a ``requests.Response``. Connection
+    errors and retryable status codes are retried with jittered exponential
+    backoff; other failures end the job. Job states are ``queued``,
+    ``sending``, ``retrying``, ``sent`` and ``failed``. Jobs live in memory
+    of the worker process and are forgotten ``SEND_JOB_TTL`` seconds after
+    they finish.
+    """
+
+    def __init__(self, send, workers=None, queue_size=None, max_attempts=None):
+        self.send = send
+        self.workers = workers or int(os.getenv("SEND_WORKERS", DEFAULT_WORKERS))
+        self.max_attempts = max_attempts or int(os.getenv("SEND_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+        self.backoff_base = float(os.getenv("SEND_BACKOFF_BASE", DEFAULT_BACKOFF_BASE))
+        self.backoff_max = float(os.getenv("SEND_BACKOFF_MAX", DEFAULT_BACKOFF_MAX))
+        self.job_ttl = float(os.getenv("SEND_JOB_TTL", DEFAULT_JOB_TTL))
+
+        self._queue = queue.Queue(maxsize=queue_size or int(os.getenv("SEND_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)))
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self._threads = []
+
+    @property
+    def capacity(self):
+        """Most jobs that can be pending at once; ``None`` when unbounded."""
+        return self._queue.maxsize or None
+
+    def submit(self, job_id, **job_kwargs):
+        return self.submit_many([(job_id, job_kwargs)])[0]
+
+    def submit_many(self, jobs):
+        """Queue every ``(job_id, job_kwargs)`` pair, or none of them when they do not all fit."""
+        self._start_workers()
+        self._prune_finished_jobs()
+
+        # Workers only take jobs out, so the free slots counted here stay free while the jobs go in
+        with self._submit_lock:
+            if self.capacity is not None and len(jobs) > self.capacity - self._queue.qsize():
+                raise QueueFull(f"Send queue is full ({self._queue.qsize()} of {self.capacity} jobs pending, "
+                                f"{len(jobs)} more requested).")
+
+            with self._lock:
+                for job_id, _ in jobs:
+                    self._jobs[job_id] = {"jobId": job_id, "status": "queued", "attempts": 0, "error": None,
+                                          "updatedAt": time.time()}
+            for job in jobs:
+                self._queue.put_nowait(job)
+
+        return [self.status(job_id) for job_id, _ in jobs]
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id, **values):
+        with self._lock:
+            self._jobs[job_id].update(values, updatedAt=time.time())
+
+    def _start_workers(self):
+        with self._lock:
+            # Started on first use so threads are created in the serving process, not before a fork
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"send-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _prune_finished_jobs(self):
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job["status"] in ("sent", "failed") and job["updatedAt"] < cutoff]:
+                del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job_id, job_kwargs = self._queue.get()
+            try:
+                self._run(job_id, job_kwargs)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id, job_kwargs):
+        for attempt in range(self.max_attempts):
+            self._update(job_id, status="sending", attempts=attempt + 1)
+            try:
+                response = self.send(**job_kwargs)
+                if response.status_code == 200:
+                    self._update(job_id, status="sent", error=None)
+                    metrics.inc("send_jobs_total", status="sent")
+                    return
+                error = f"Failed to send document: {response.status_code} {response.text}"
+                retryable = response.status_code in RETRYABLE_STATUS_CODES
+            except (requests.RequestException, RuntimeError) as e:
+                error = str(e)
+                retryable = True
+            except Exception as e:
+                error = str(e)
+                retryable = False
+
+            print(f"Sending job {job_id} failed ({attempt + 1}/{self.max_attempts}): {error}")
+            if not retryable or attempt + 1 == self.max_attempts:
+                self._update(job_id, status="failed", error=error)
+                metrics.inc("send_jobs_total", status="failed")
+                return
+
+            metrics.inc("send_retries_total")
+            self._update(job_id, status="retrying", error=error)
+            time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
@@ -162,5 +162,106 @@ namespace OlympiadApi.Tests.Controllers
             var error = Assert.IsType<ObjectResult>(result);
             Assert.Equal(500, error.StatusCode);
         }
+
+        [Fact]
+        public async Task UpdateOlympiad_ReturnsOk_WhenUpdated()
+        {
+            var olympiad = new Olympiad
+            {
+                OlympiadId = 3,
+                Subject = "Math",
+                Description = "none",
+                DateOfOlympiad = new DateTime(2025, 1, 12),
+                Round = "District Ring",
+                Location = "Bulgaria",
+                ClassNumber = 10
+            };
+
+            _serviceMock.Setup(s => s.UpdateOlympiadAsync(3, olympiad)).ReturnsAsync(olympiad);
+
+            var result = await _controller.UpdateOlympiad(3, olympiad);
+
+            var okResult = Assert.IsType<OkObjectResult>(result);
+            Assert.Equal(olympiad, okResult.Value);
+        }
+
+        [Fact]
+        public async Task UpdateOlympiad_ReturnsNotFound_WhenMissing()
+        {
+            var olympiad = new Olympiad
+            {
+                Subject = "Math",
+                DateOfOlympiad = new DateTime(2025, 1, 12),
+                Round = "District Ring",
+                Location = "Bulgaria",
+                ClassNumber = 10
+            };
+
+            _serviceMock.Setup(s => s.UpdateOlympiadAsync(42, olympiad)).ReturnsAsync((Olympiad?)null);
+
+            var result = await _controller.UpdateOlympiad(42, olympiad);
+
+            Assert.IsType<NotFoundObjectResult>(result);
+        }
+
+        [Fact]
+        public async Task UpdateOlympiad_ReturnsBadRequest_WhenNull()
+        {
+            var result = await _controller.UpdateOlympiad(1, null!);
+
+            var badRequest = Assert.IsType<BadRequestObjectResult>(result);
+            Assert.Contains("Invalid data", badRequest.Value!.ToString());
+        }
+
+        [Fact]
+        public async Task UpdateOlympiad_Returns500_OnException()
+        {
+            var olympiad = new Olympiad
+            {
+                Subject = "Error",
+                DateOfOlympiad = DateTime.Now,
+                Round = "Error",
+                Location = "Error",
+                ClassNumber = 11
+            };
+
+            _serviceMock.Setup(s => s.UpdateOlympiadAsync(It.IsAny<int>(), It.IsAny<Olympiad>())).Throws(new Exception("Update error"));
+
+            var result = await _controller.UpdateOlympiad(1, olympiad);
+
+            var error = Assert.IsType<ObjectResult>(result);
+            Assert.Equal(500, error.StatusCode);
+        }
+
+        [Fact]
+        public async Task DeleteOlympiad_ReturnsNoContent_WhenDeleted()
+        {
+            _serviceMock.Setup(s => s.DeleteOlympiadAsync(1)).ReturnsAsync(true);
+
+            var result = await _controller.DeleteOlympiad(1);
+
+            Assert.IsType<NoContentResult>(result);
+        }
+
+        [Fact]
+        public async Task DeleteOlympiad_ReturnsNotFound_WhenMissing()
+        {
+            _serviceMock.Setup(s => s.DeleteOlympiadAsync(1)).ReturnsAsync(false);
+
+            var result = await _controller.DeleteOlympiad(1);
+
+            Assert.IsType<NotFoundObjectResult>(result);
+        }
+
+        [Fact]
+        public async Task DeleteOlympiad_Returns500_OnException()
+        {
+            _serviceMock.Setup(s => s.DeleteOlympiadAsync(It.IsAny<int>())).Throws(new Exception("Delete error"));
+
+            var result = await _controller.DeleteOlympiad(1);
+
+            var error = Assert.IsType<ObjectResult>(result);
+            Assert.Equal(500, error.StatusCode);
+        }
     }
 }
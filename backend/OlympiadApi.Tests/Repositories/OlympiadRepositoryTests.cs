@@ -283,5 +283,99 @@ namespace OlympiadApi.Tests.Repositories
             var ex = await Assert.ThrowsAsync<KeyNotFoundException>(() => repo.GetOlympiadByIdAsync(999));
             Assert.Equal("Olympiad with ID 999 not found.", ex.Message);
         }
+
+        [Fact]
+        public async Task UpdateOlympiad_UpdatesExistingOlympiad()
+        {
+            using var context = GetInMemoryDbContext();
+
+            var olympiad = new Olympiad
+            {
+                OlympiadId = 7,
+                Subject = "Math",
+                DateOfOlympiad = DateTime.UtcNow,
+                Round = "First",
+                Location = "Sofia",
+                ClassNumber = 9,
+                AcademicYearId = 1
+            };
+            context.Olympiads.Add(olympiad);
+            context.SaveChanges();
+
+            var repo = new OlympiadRepository(context);
+            var updated = new Olympiad
+            {
+                Subject = "Math",
+                DateOfOlympiad = olympiad.DateOfOlympiad,
+                Round = "First",
+                Location = "Plovdiv",
+                StartTime = olympiad.DateOfOlympiad.AddHours(10),
+                ClassNumber = 9,
+                AcademicYearId = 1
+            };
+
+            var result = await repo.UpdateOlympiadAsync(7, updated);
+
+            Assert.NotNull(result);
+            Assert.Equal("Plovdiv", context.Olympiads.Single().Location);
+            Assert.Equal(updated.StartTime, context.Olympiads.Single().StartTime);
+        }
+
+        [Fact]
+        public async Task UpdateOlympiad_ReturnsNull_WhenNotFound()
+        {
+            using var context = GetInMemoryDbContext();
+            var repo = new OlympiadRepository(context);
+
+            var updated = new Olympiad
+            {
+                Subject = "Math",
+                DateOfOlympiad = DateTime.UtcNow,
+                Round = "First",
+                Location = "Sofia",
+                ClassNumber = 9,
+                AcademicYearId = 1
+            };
+
+            var result = await repo.UpdateOlympiadAsync(404, updated);
+
+            Assert.Null(result);
+        }
+
+        [Fact]
+        public async Task DeleteOlympiad_RemovesOlympiad()
+        {
+            using var context = GetInMemoryDbContext();
+
+            context.Olympiads.Add(new Olympiad
+            {
+                OlympiadId = 8,
+                Subject = "Physics",
+                DateOfOlympiad = DateTime.UtcNow,
+                Round = "Second",
+                Location = "Varna",
+                ClassNumber = 10,
+                AcademicYearId = 1
+            });
+            context.SaveChanges();
+
+            var repo = new OlympiadRepository(context);
+
+            var result = await repo.DeleteOlympiadAsync(8);
+
+            Assert.True(result);
+            Assert.Empty(context.Olympiads);
+        }
+
+        [Fact]
+        public async Task DeleteOlympiad_ReturnsFalse_WhenNotFound()
+        {
+            using var context = GetInMemoryDbContext();
+            var repo = new OlympiadRepository(context);
+
+            var result = await repo.DeleteOlympiadAsync(404);
+
+            Assert.False(result);
+        }
     }
 }
@@ -98,5 +98,45 @@ namespace OlympiadApi.Tests.Services
             Assert.NotNull(result);
             Assert.Equal("Chemistry", result.Subject);
         }
+
+        [Fact]
+        public async Task UpdateOlympiad_ValidOlympiad_CallsRepository()
+        {
+            var olympiad = CreateValidOlympiad();
+
+            _repositoryMock.Setup(r => r.UpdateOlympiadAsync(1, olympiad)).ReturnsAsync(olympiad);
+
+            var result = await _service.UpdateOlympiadAsync(1, olympiad);
+
+            Assert.Equal(olympiad, result);
+            _repositoryMock.Verify(r => r.UpdateOlympiadAsync(1, olympiad), Times.Once);
+        }
+
+        [Fact]
+        public async Task UpdateOlympiad_NullOlympiad_ThrowsArgumentNullException()
+        {
+            await Assert.ThrowsAsync<ArgumentNullException>(() => _service.UpdateOlympiadAsync(1, null!));
+        }
+
+        [Fact]
+        public async Task UpdateOlympiad_EmptySubject_ThrowsArgumentException()
+        {
+            var olympiad = CreateValidOlympiad();
+            olympiad.Subject = "";
+
+            var ex = await Assert.ThrowsAsync<ArgumentException>(() => _service.UpdateOlympiadAsync(1, olympiad));
+            Assert.Equal("Subject is required. (Parameter 'Subject')", ex.Message);
+        }
+
+        [Fact]
+        public async Task DeleteOlympiad_CallsRepository()
+        {
+            _repositoryMock.Setup(r => r.DeleteOlympiadAsync(1)).ReturnsAsync(true);
+
+            var result = await _service.DeleteOlympiadAsync(1);
+
+            Assert.True(result);
+            _repositoryMock.Verify(r => r.DeleteOlympiadAsync(1), Times.Once);
+        }
     }
 }
@@ -71,5 +71,50 @@ namespace OlympiadApi.Controllers
                 return StatusCode(500, new { message = "An error occurred while creating the Olympiad.", error = ex.Message });
             }
         }
+
+        // PUT: api/olympiads/{id}
+        [HttpPut("{id}")]
+        [RoleAuthorize("Admin")]
+        public async Task<IActionResult> UpdateOlympiad(int id, [FromBody] Olympiad olympiad)
+        {
+            try
+            {
+                if (olympiad == null)
+                {
+                    return BadRequest(new { message = "Invalid data." });
+                }
+
+                var updatedOlympiad = await _olympiadService.UpdateOlympiadAsync(id, olympiad);
+                if (updatedOlympiad == null)
+                {
+                    return NotFound(new { message = "Olympiad not found." });
+                }
+                return Ok(updatedOlympiad);
+            }
+            catch (Exception ex)
+            {
+                return StatusCode(500, new { message = "An error occurred while updating the Olympiad.", error = ex.Message });
+            }
+        }
+
+        // DELETE: api/olympiads/{id}
+        [HttpDelete("{id}")]
+        [RoleAuthorize("Admin")]
+        public async Task<IActionResult> DeleteOlympiad(int id)
+        {
+            try
+            {
+                var deleted = await _olympiadService.DeleteOlympiadAsync(id);
+                if (!deleted)
+                {
+                    return NotFound(new { message = "Olympiad not found." });
+                }
+                return NoContent();
+            }
+            catch (Exception ex)
+            {
+                return StatusCode(500, new { message = "An error occurred while deleting the Olympiad.", error = ex.Message });
+            }
+        }
     }
 }
@@ -51,5 +51,36 @@ namespace OlympiadApi.Repositories.Implementations
 
             return olympiad;
         }
+
+        public async Task<Olympiad?> UpdateOlympiadAsync(int id, Olympiad updatedOlympiad)
+        {
+            if (updatedOlympiad == null)
+                throw new ArgumentNullException(nameof(updatedOlympiad));
+
+            var olympiad = await _context.Olympiads.FindAsync(id);
+            if (olympiad == null) return null;
+
+            olympiad.Subject = updatedOlympiad.Subject;
+            olympiad.Description = updatedOlympiad.Description;
+            olympiad.DateOfOlympiad = updatedOlympiad.DateOfOlympiad;
+            olympiad.Round = updatedOlympiad.Round;
+            olympiad.Location = updatedOlympiad.Location;
+            olympiad.StartTime = updatedOlympiad.StartTime;
+            olympiad.ClassNumber = updatedOlympiad.ClassNumber;
+            olympiad.AcademicYearId = updatedOlympiad.AcademicYearId;
+
+            await _context.SaveChangesAsync();
+            return olympiad;
+        }
+
+        public async Task<bool> DeleteOlympiadAsync(int id)
+        {
+            var olympiad = await _context.Olympiads.FindAsync(id);
+            if (olympiad == null) return false;
+
+            _context.Olympiads.Remove(olympiad);
+            await _context.SaveChangesAsync();
+            return true;
+        }
     }
 }
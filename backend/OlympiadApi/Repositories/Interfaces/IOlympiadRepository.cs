@@ -9,5 +9,9 @@ namespace OlympiadApi.Repositories.Interfaces
         Task<IEnumerable<Olympiad>> GetAllOlympiadsAsync();
 
         Task<Olympiad> GetOlympiadByIdAsync(int id);
+
+        Task<Olympiad?> UpdateOlympiadAsync(int id, Olympiad updatedOlympiad);
+
+        Task<bool> DeleteOlympiadAsync(int id);
     }
 }
@@ -7,5 +7,7 @@ namespace OlympiadApi.Services.Interfaces
         Task<IEnumerable<Olympiad>> GetAllOlympiadsAsync();
         Task<Olympiad?> GetOlympiadByIdAsync(int id);
         Task<Olympiad> AddOlympiadAsync(Olympiad olympiad);
+        Task<Olympiad?> UpdateOlympiadAsync(int id, Olympiad olympiad);
+        Task<bool> DeleteOlympiadAsync(int id);
     }
 }
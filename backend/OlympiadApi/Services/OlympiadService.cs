@@ -36,5 +36,24 @@ namespace OlympiadApi.Services
         {
             return await _repository.GetOlympiadByIdAsync(id);
         }
+
+        public async Task<Olympiad?> UpdateOlympiadAsync(int id, Olympiad olympiad)
+        {
+            if (olympiad == null)
+                throw new ArgumentNullException(nameof(olympiad));
+
+            if (string.IsNullOrEmpty(olympiad.Subject))
+                throw new ArgumentException("Subject is required.", nameof(olympiad.Subject));
+
+            if (olympiad.DateOfOlympiad == default)
+                throw new ArgumentException("Date of Olympiad is required.", nameof(olympiad.DateOfOlympiad));
+
+            return await _repository.UpdateOlympiadAsync(id, olympiad);
+        }
+
+        public async Task<bool> DeleteOlympiadAsync(int id)
+        {
+            return await _repository.DeleteOlympiadAsync(id);
+        }
     }
 }
@@ -0,0 +1,51 @@
+import argparse
+
+from src.exceptions import EnvironmentVariableError
+from src.http_cache import HttpCache
+from src.load_env import force_download_enabled, get_metrics_summary_dir
+from src.metrics import metrics
+
+
+def add_backfill_arguments(parser):
+    parser.add_argument("first_year", type=int, help="start year of the first academic year, e.g. 2019 for 2019-2020")
+    parser.add_argument("last_year", type=int, help="start year of the last academic year")
+    parser.add_argument("--workers", type=int, default=None, help="concurrent downloads (default BACKFILL_WORKERS)")
+    parser.add_argument("--no-upload", action="store_true", help="only write the per-year JSON Lines files")
+
+
+def run_backfill(first_year, last_year, upload=True, max_workers=None):
+    # Imported here, so the scraper CLI can build its parser without loading the pipeline
+    from src.backfill import backfill_years
+
+    cache = HttpCache()
+    if force_download_enabled():
+        cache.entries.clear()
+
+    written = backfill_years(first_year, last_year, cache=cache, max_workers=max_workers, upload=upload)
+    if not written:
+        print("No new bulletins downloaded. Nothing to process.")
+
+    if upload:
+        cache.save()
+    else:
+        # Nothing was uploaded, so a later run must still fetch and upload these years
+        print("Upload skipped. The HTTP cache is left unchanged.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the olympiad bulletins of past academic years.")
+    add_backfill_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        run_backfill(args.first_year, args.last_year, upload=not args.no_upload, max_workers=args.workers)
+    except EnvironmentVariableError as e:
+        print(f"Configuration error: {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+    finally:
+        print(f"Run metrics written to {metrics.write_summary(get_metrics_summary_dir())}")
+
+
+if __name__ == "__main__":
+    main()
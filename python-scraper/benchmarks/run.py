@@ -0,0 +1,254 @@
+"""Benchmark the scraper pipeline stages.
+
+Run from the python-scraper directory::
+
+    python -m benchmarks.run                   # compare against benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline   # store this run as the new baseline
+
+Every stage runs on the checked-in sample bulletin and on synthetic bulletins
+of ``--pages`` pages, generated with a fixed seed:
+
+* ``extract``: ``pdf_to_word_and_extract_table`` (pdfplumber, TXT dump)
+* ``normalize``: ``convert_roman_to_arabic`` + ``expand_ranges_in_text`` on every table cell
+* ``parse``: ``extract_and_process_text`` (TXT to JSON Lines)
+* ``upload``: ``upload_olympiads`` against a local stub of the OlympiadApi
+
+Each stage reports throughput, p50/p95 latency over ``--repeat`` runs and
+the peak memory of one extra run under tracemalloc. Peak memory covers this
+process only, so extraction runs in-process (``EXTRACT_WORKERS=1``) unless
+``--extract-workers`` says otherwise. Baselines are machine specific; store
+one on the machine the comparison runs on.
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pdfplumber
+
+from benchmarks.stub_api import start_stub_api
+from benchmarks.synthetic_bulletin import make_bulletin, page_headers
+from src.api_client import ApiClient
+from src.backend_connection import authenticate, build_olympiad_payloads, upload_olympiads
+from src.data_handling import extract_and_process_text, read_records_jsonl
+from src.pdf_processing import pdf_to_word_and_extract_table, load_page_headers
+from src.text_processing import convert_roman_to_arabic, expand_ranges_in_text
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_BULLETIN = os.path.join(BENCHMARK_DIR, "sample_bulletin.pdf")
+SAMPLE_PAGES = 4
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_PAGES = "20,80"
+DEFAULT_ROWS_PER_PAGE = 12
+# Numbers the upload journal of every measured upload run
+UPLOAD_RUNS = itertools.count()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile, exact for the small sample counts used here."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def measure(stage, repeat):
+    """Run ``stage()`` once to warm up, ``repeat`` times timed and once under tracemalloc.
+
+    ``stage`` returns the number of units it processed. The pipeline prints
+    progress for every item, so its output is discarded while measuring.
+    """
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        units = stage()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            stage()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            stage()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    p50 = percentile(timings, 50)
+    return {
+        "units": units,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "throughput": round(units / p50, 1) if p50 else None,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def table_cells(pdf_path):
+    """Raw, unnormalized cells of every competition level table in the PDF."""
+    cells = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_index in load_page_headers():
+            if page_index < len(pdf.pages):
+                for table in pdf.pages[page_index].extract_tables()[:1]:
+                    cells += [cell or "" for row in table for cell in row]
+    return cells
+
+
+def configure_bulletin(pdf_path, pages, work_dir):
+    os.environ.update({
+        "PDF_FILE_PATH": pdf_path,
+        "PDF_PAGE_HEADERS": json.dumps(page_headers(pages), ensure_ascii=False),
+        "OUTPUT_WORD_PATH": os.path.join(work_dir, "extracted_table.docx"),
+        "OUTPUT_TXT_PATH": os.path.join(work_dir, "extracted_table.txt"),
+        "OUTPUT_JSON_PATH": os.path.join(work_dir, "extracted_table.jsonl"),
+    })
+
+
+def benchmark_bulletin(pdf_path, client, stub, repeat):
+    results = {}
+
+    results["extract"] = measure(lambda: len(pdf_to_word_and_extract_table()), repeat)
+
+    cells = table_cells(pdf_path)
+
+    def normalize():
+        for cell in cells:
+            expand_ranges_in_text(convert_roman_to_arabic(cell))
+        return len(cells)
+
+    results["normalize"] = measure(normalize, repeat)
+
+    def parse():
+        extract_and_process_text()
+        with open(os.environ["OUTPUT_JSON_PATH"], encoding="utf-8") as jsonl_file:
+            return sum(1 for _ in jsonl_file)
+
+    results["parse"] = measure(parse, repeat)
+
+    records = list(read_records_jsonl(os.environ["OUTPUT_JSON_PATH"]))
+    journal_dir = os.path.dirname(os.environ["OUTPUT_JSON_PATH"])
+    olympiad_endpoint = f"http://127.0.0.1:{stub.server_port}/api/olympiads"
+
+    def upload():
+        # A fresh journal per run, so nothing is skipped but journaling is still measured
+        os.environ["UPLOAD_JOURNAL_PATH"] = os.path.join(journal_dir, f"upload_journal_{next(UPLOAD_RUNS)}.sqlite")
+        posts = stub.posts
+        upload_olympiads(client, olympiad_endpoint, build_olympiad_payloads(records, 1))
+        # A record spanning several days is one POST per day
+        return stub.posts - posts
+
+    results["upload"] = measure(upload, repeat)
+    return results
+
+
+def run_benchmarks(page_counts, repeat, rows_per_page, latency, concurrency, extract_workers):
+    stub = start_stub_api(latency)
+    base_url = f"http://127.0.0.1:{stub.server_port}"
+    os.environ.update({
+        "LOGIN_URL": f"{base_url}/api/auth/login",
+        "USERNAME": "benchmark",
+        "PASSWORD": "benchmark",
+        "OLYMPIAD_UPLOAD_LIMIT": "unlimited",
+        "UPLOAD_CONCURRENCY": str(concurrency),
+        "EXTRACT_WORKERS": str(extract_workers),
+        "EXPORT_DOCX": "false",
+    })
+
+    bulletins = [("sample", SAMPLE_BULLETIN, SAMPLE_PAGES)]
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir, ApiClient(pool_size=concurrency) as client:
+        authenticate(client)
+
+        for pages in page_counts:
+            pdf_path = os.path.join(work_dir, f"synthetic-{pages}p.pdf")
+            make_bulletin(pdf_path, pages=pages, rows_per_page=rows_per_page)
+            bulletins.append((f"synthetic-{pages}p", pdf_path, pages))
+
+        for name, pdf_path, pages in bulletins:
+            print(f"Benchmarking {name}...", file=sys.stderr)
+            configure_bulletin(pdf_path, pages, work_dir)
+            stages = benchmark_bulletin(pdf_path, client, stub, repeat)
+            for stage, result in stages.items():
+                results[f"{name}/{stage}"] = result
+
+    stub.shutdown()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print every result next to its baseline; return the keys slower than ``tolerance`` allows."""
+    regressions = []
+    print(f"{'benchmark':<28}{'units':>7}{'p50 ms':>11}{'p95 ms':>11}{'units/s':>11}{'peak KiB':>11}{'p50 vs base':>13}")
+    for key, result in results.items():
+        base = baseline.get(key)
+        delta = ""
+        if base and base.get("p50_ms"):
+            change = result["p50_ms"] / base["p50_ms"] - 1
+            delta = f"{change:+.1%}"
+            if change > tolerance:
+                regressions.append(key)
+                delta += " !"
+        print(f"{key:<28}{result['units']:>7}{result['p50_ms']:>11.2f}{result['p95_ms']:>11.2f}"
+              f"{result['throughput'] or 0:>11.1f}{result['peak_kib']:>11.1f}{delta:>13}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper pipeline stages.")
+    parser.add_argument("--pages", default=DEFAULT_PAGES, help="comma separated page counts of synthetic bulletins")
+    parser.add_argument("--rows-per-page", type=int, default=DEFAULT_ROWS_PER_PAGE)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds the stub API waits per request")
+    parser.add_argument("--concurrency", type=int, default=8, help="UPLOAD_CONCURRENCY for the upload stage")
+    parser.add_argument("--extract-workers", type=int, default=1, help="EXTRACT_WORKERS for the extract stage")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown before failing")
+    parser.add_argument("--output", help="also write the results as JSON to this path")
+    args = parser.parse_args()
+
+    page_counts = [int(pages) for pages in args.pages.split(",") if pages.strip()]
+    results = run_benchmarks(page_counts, args.repeat, args.rows_per_page, args.latency, args.concurrency,
+                             args.extract_workers)
+
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "concurrency": args.concurrency,
+            "extract_workers": args.extract_workers,
+        },
+        "results": results,
+    }
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file).get("results", {})
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Results written to {path}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) more than {args.tolerance:.0%} slower than the baseline: "
+              f"{', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Never expires, so the token provider logs in once per benchmark run
+STUB_TOKEN = "eyJhbGciOiJub25lIn0.eyJleHAiOjQxMDI0NDQ4MDB9."
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    """Answers like the OlympiadApi: login returns a token, writes succeed, lists are empty."""
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    # Send headers and body in one segment; otherwise Nagle's algorithm and
+    # delayed ACKs add ~40 ms to every keep-alive request
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.latency:
+            time.sleep(self.latency)
+
+    def do_GET(self):
+        self._read_body()
+        self._reply(200, [])
+
+    def do_POST(self):
+        self._read_body()
+        self.server.posts += 1
+        if self.path.endswith("/login"):
+            self._reply(200, {"token": STUB_TOKEN})
+        else:
+            self._reply(200, {})
+
+    def do_PUT(self):
+        self._read_body()
+        self._reply(204, {})
+
+    def do_DELETE(self):
+        self._read_body()
+        self._reply(204, {})
+
+
+def start_stub_api(latency=0.0):
+    """Serve the stub API on a free local port in a background thread.
+
+    ``latency`` seconds are added to every request to mimic a remote backend.
+    Returns the server; its base URL is ``http://127.0.0.1:<server_port>``.
+    """
+    handler = type("StubApi", (StubApiHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.posts = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
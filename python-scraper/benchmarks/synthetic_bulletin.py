@@ -0,0 +1,99 @@
+import argparse
+import os
+import random
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, PageBreak, Paragraph
+
+from src.pdf_processing import DEFAULT_PAGE_HEADERS
+from src.text_processing import translation_dict
+
+FONT_NAME = "BenchmarkArial"
+# The bulletins are in Cyrillic, so a TTF font is needed; the document filling service ships one
+DEFAULT_FONT_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "automatic_document_filling", "fonts", "Arial.ttf")
+
+COLUMNS = ["ПРЕДМЕТ", "КЛАС", "ОРГАНИЗАТОР", "ДАТА"]
+# Subjects as printed in the bulletins, with a Cyrillic "Х"
+SUBJECTS = [subject.replace("X", "Х") for subject in translation_dict]
+CLASSES = ["IV – VII", "V – XII КЛАС", "VIII – XII", "IХ – Х", "ХI, ХII", "VII"]
+ORGANIZERS = ["РУО", "МОН", "РУО И МОН"]
+
+
+def register_font(font_path=None):
+    if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(FONT_NAME, font_path or os.getenv("BENCHMARK_FONT_PATH", DEFAULT_FONT_PATH)))
+
+
+def random_date_cell(rng):
+    day = rng.randint(1, 25)
+    month = rng.randint(1, 5)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return f"{day:02d}.{month:02d} - {day + 2:02d}.{month:02d}.2025 Г."
+    if kind == 1:
+        return f"{day:02d}.{month:02d}.2025 Г. НАЧАЛО {rng.choice(['09:00', '10:00', '14:00'])} Ч."
+    return f"ДО {day:02d}.{month:02d}.2025 Г."
+
+
+def page_headers(pages):
+    """``PDF_PAGE_HEADERS`` for a synthetic bulletin of ``pages`` pages.
+
+    The first page is a cover, like in the real bulletins; the table pages are
+    split evenly between the competition levels.
+    """
+    levels = list(DEFAULT_PAGE_HEADERS.values())
+    table_pages = max(pages - 1, len(levels))
+    headers = {}
+    for index, level in enumerate(levels):
+        start = 1 + index * table_pages // len(levels)
+        end = (index + 1) * table_pages // len(levels)
+        headers[f"{start}-{end}"] = level
+    return headers
+
+
+def make_bulletin(output, pages=4, rows_per_page=12, seed=0, font_path=None):
+    """Write a bulletin-shaped PDF with a cover and one olympiad table per page.
+
+    ``output`` is a path or a binary file-like object. The content is fully
+    determined by ``seed``, so repeated runs benchmark the same document.
+    """
+    register_font(font_path)
+    rng = random.Random(seed)
+
+    style = ParagraphStyle("cover", fontName=FONT_NAME, fontSize=16)
+    story = [Paragraph("ГРАФИК ЗА ПРОВЕЖДАНЕ НА ОЛИМПИАДИТЕ", style), PageBreak()]
+
+    for _ in range(max(pages - 1, 1)):
+        data = [COLUMNS]
+        for _ in range(rows_per_page):
+            data.append([rng.choice(SUBJECTS), rng.choice(CLASSES), rng.choice(ORGANIZERS), random_date_cell(rng)])
+
+        table = Table(data)
+        table.setStyle(TableStyle([
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+            ("FONTNAME", (0, 0), (-1, -1), FONT_NAME),
+            ("FONTSIZE", (0, 0), (-1, -1), 7),
+        ]))
+        story += [table, PageBreak()]
+
+    SimpleDocTemplate(output, pagesize=A4).build(story)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic olympiad bulletin PDF.")
+    parser.add_argument("output", help="path of the PDF to write")
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--rows-per-page", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    make_bulletin(args.output, args.pages, args.rows_per_page, args.seed)
+    print(f"Bulletin written to {args.output}; PDF_PAGE_HEADERS={page_headers(args.pages)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,259 @@
-from src.scraper import download_pdf
-from src.pdf_processing import pdf_to_word_and_extract_table
-from src.data_handling import extract_and_process_text
+"""Olympiad bulletin scraper.
+
+Without a subcommand the whole pipeline runs in memory, as the container does.
+Single stages hand over through the files configured in ``.env``::
+
+    python main.py download   # new bulletin -> PDF_FILE_PATH
+    python main.py extract    # PDF_FILE_PATH -> OUTPUT_TXT_PATH
+    python main.py parse      # OUTPUT_TXT_PATH -> OUTPUT_JSON_PATH
+    python main.py upload     # OUTPUT_JSON_PATH -> OlympiadApi (OLYMPIAD_SYNC_MODE)
+    python main.py sync --dry-run
+    python main.py run-all --from parse --to upload
+
+Heavy dependencies (pdfplumber, supabase, bcrypt, python-docx) are imported
+by the stages that use them, so short runs only load what they need.
+"""
+import argparse
+import os
+
 from src.exceptions import EnvironmentVariableError
-from src.backend_connection import process_and_send_data
+from src.load_env import (
+    load_environment_variables,
+    debug_output_enabled,
+    force_download_enabled,
+    docx_export_enabled,
+    get_metrics_summary_dir,
+)
+from src.metrics import metrics
+from backfill import add_backfill_arguments, run_backfill
 
-def main():
-    try:
-        download_pdf()
+STAGES = ("download", "extract", "parse", "upload")
+
+
+def run_pipeline(debug_output=False):
+    """Run every stage in memory; intermediate files are only written for debugging."""
+    from src.scraper import download_pdf
+    from src.pdf_processing import write_rows_to_txt
+    from src.data_handling import tee_records_jsonl
+    from src.parse_cache import ParseCache, parse_pdf
+    from src.backend_connection import process_and_send_data
+    from src.http_cache import HttpCache
+
+    cache = HttpCache()
+    if force_download_enabled():
+        cache.entries.clear()
+
+    downloaded = download_pdf(write_to_disk=False, cache=cache)
+    if downloaded is None:
+        cache.save()
+        print("No new PDF downloaded. Nothing to process.")
+        return
+
+    tables, rows, records = parse_pdf(downloaded.content, ParseCache())
+
+    if debug_output:
+        PDF_FILE_PATH, _, OUTPUT_TXT_PATH, OUTPUT_JSON_PATH = load_environment_variables()
+        # The same files the stage commands hand over, so a debug run can be resumed with run-all --from
+        write_pdf(downloaded.content, PDF_FILE_PATH)
+        write_rows_to_txt(rows, OUTPUT_TXT_PATH)
+        # Records are written out as the uploader consumes them
+        records = tee_records_jsonl(records, OUTPUT_JSON_PATH)
+
+    if docx_export_enabled():
+        from src.docx_export import export_tables_to_docx
+        _, OUTPUT_WORD_PATH, _, _ = load_environment_variables()
+        export_tables_to_docx(tables, OUTPUT_WORD_PATH)
+
+    with metrics.stage("upload"):
+        result = process_and_send_data(records)
+
+    # Finish the JSON Lines file and the parse cache entry even when the
+    # upload stopped early, e.g. at the upload limit
+    for _ in records:
+        pass
+
+    # Only remember the download once every olympiad was uploaded, so an
+    # incomplete run (failed uploads, the upload limit, a dry run) is retried
+    if result is not None and result.complete:
+        cache.save()
+    else:
+        print("Upload incomplete. The bulletin will be processed again on the next run.")
+
+
+def require_artifact(path, stage):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} does not exist. Run the {stage} stage first.")
+
+
+def write_pdf(content, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as pdf_file:
+        pdf_file.write(content)
+    print(f"PDF saved successfully: {path}")
+
+
+def pending_cache_path(pdf_path):
+    """HTTP cache entries of the bulletin at ``pdf_path``, kept until the upload stage completes."""
+    return f"{pdf_path}.http_cache.json"
+
+
+def run_download():
+    """Save a new bulletin to ``PDF_FILE_PATH``; returns False when there is none.
+
+    The HTTP cache is not saved here: its entries travel next to the PDF and
+    are only committed by the upload stage, so a bulletin whose later stages
+    fail or never run is downloaded again.
+    """
+    from src.scraper import download_pdf
+    from src.http_cache import HttpCache
+
+    PDF_FILE_PATH, _, _, _ = load_environment_variables()
+
+    cache = HttpCache()
+    if force_download_enabled():
+        cache.entries.clear()
+
+    downloaded = download_pdf(write_to_disk=False, cache=cache)
+    if downloaded is None:
+        cache.save()
+        print("No new PDF downloaded. Nothing to process.")
+        return False
+
+    write_pdf(downloaded.content, PDF_FILE_PATH)
+    cache.save(pending_cache_path(PDF_FILE_PATH))
+    return True
+
+
+def run_extract():
+    from src.pdf_processing import pdf_to_word_and_extract_table
+
+    PDF_FILE_PATH, _, _, _ = load_environment_variables()
+    require_artifact(PDF_FILE_PATH, "download")
+    with metrics.stage("extract"):
         pdf_to_word_and_extract_table()
+    return True
+
+
+def run_parse():
+    from src.data_handling import extract_and_process_text
+
+    _, _, OUTPUT_TXT_PATH, _ = load_environment_variables()
+    require_artifact(OUTPUT_TXT_PATH, "extract")
+    with metrics.stage("parse"):
         extract_and_process_text()
-        process_and_send_data()
+    return True
+
+
+def run_upload():
+    from src.backend_connection import process_and_send_data
+
+    PDF_FILE_PATH, _, _, OUTPUT_JSON_PATH = load_environment_variables()
+    require_artifact(OUTPUT_JSON_PATH, "parse")
+    with metrics.stage("upload"):
+        result = process_and_send_data()
+
+    if result is not None and result.complete:
+        commit_pending_cache(PDF_FILE_PATH)
+    else:
+        print("Upload incomplete. The bulletin stays unprocessed until the upload stage completes.")
+    return True
+
+
+def commit_pending_cache(pdf_path):
+    """Mark the bulletin downloaded by the download stage as processed."""
+    from src.http_cache import HttpCache
+
+    pending_path = pending_cache_path(pdf_path)
+    if not os.path.exists(pending_path):
+        return
+
+    cache = HttpCache()
+    cache.entries.update(HttpCache(pending_path).entries)
+    cache.save()
+    os.remove(pending_path)
+
+
+STAGE_RUNNERS = {
+    "download": run_download,
+    "extract": run_extract,
+    "parse": run_parse,
+    "upload": run_upload,
+}
+
+
+def run_stages(first_stage="download", last_stage="upload"):
+    """Run the stages from ``first_stage`` to ``last_stage`` through their files.
+
+    Starting after ``download`` resumes from the files an earlier run left;
+    the chain stops early when no new bulletin was downloaded.
+    """
+    first, last = STAGES.index(first_stage), STAGES.index(last_stage)
+    if first > last:
+        raise ValueError(f"Stage '{first_stage}' comes after '{last_stage}'.")
+
+    for stage in STAGES[first:last + 1]:
+        print(f"\n== {stage} ==")
+        if not STAGE_RUNNERS[stage]():
+            return
+
+
+def run_command(args):
+    if args.command in (None, "run-all"):
+        if args.command is None or (args.first_stage is None and args.last_stage is None):
+            run_pipeline(debug_output=getattr(args, "debug", False) or debug_output_enabled())
+        else:
+            run_stages(args.first_stage or STAGES[0], args.last_stage or STAGES[-1])
+    elif args.command == "sync":
+        # The upload stage syncs according to OLYMPIAD_SYNC_MODE
+        os.environ["OLYMPIAD_SYNC_MODE"] = "dry-run" if args.dry_run else "sync"
+        run_upload()
+    elif args.command == "backfill":
+        run_backfill(args.first_year, args.last_year, upload=not args.no_upload, max_workers=args.workers)
+    else:
+        STAGE_RUNNERS[args.command]()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Scrape the olympiad bulletin and load it into the OlympiadApi.")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    subparsers.add_parser("download", help="download a new bulletin to PDF_FILE_PATH")
+    subparsers.add_parser("extract", help="extract the bulletin tables to OUTPUT_TXT_PATH")
+    subparsers.add_parser("parse", help="parse the extracted rows into OUTPUT_JSON_PATH")
+    subparsers.add_parser("upload", help="send the parsed olympiads to the API (OLYMPIAD_SYNC_MODE)")
+
+    sync = subparsers.add_parser("sync", help="sync the parsed olympiads with the API")
+    sync.add_argument("--dry-run", action="store_true", help="only print the planned changes")
+
+    run_all = subparsers.add_parser("run-all", help="run the whole pipeline (the default)")
+    run_all.add_argument("--from", dest="first_stage", choices=STAGES,
+                         help="resume at this stage from the files of an earlier run")
+    run_all.add_argument("--to", dest="last_stage", choices=STAGES, help="stop after this stage")
+    run_all.add_argument("--debug", action="store_true", help="also write the intermediate files (DEBUG_OUTPUT)")
+
+    add_backfill_arguments(subparsers.add_parser("backfill", help="load the bulletins of past academic years"))
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "first_stage", None) and getattr(args, "last_stage", None) \
+            and STAGES.index(args.first_stage) > STAGES.index(args.last_stage):
+        parser.error(f"--from {args.first_stage} comes after --to {args.last_stage}")
+
+    try:
+        run_command(args)
     except EnvironmentVariableError as e:
         print(f"Configuration error: {e}")
+    except FileNotFoundError as e:
+        print(f"Missing input: {e}")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+    finally:
+        print(f"Run metrics written to {metrics.write_summary(get_metrics_summary_dir())}")
 
 
 if __name__ == "__main__":
     main()
-
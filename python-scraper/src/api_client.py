@@ -0,0 +1,92 @@
+import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from src.metrics import metrics
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 10
+
+
+class ApiClient:
+    """Keep-alive HTTP client for the OlympiadApi.
+
+    Every request goes through one pooled ``requests.Session`` so repeated
+    calls reuse their TCP/TLS connections. The bearer token is stored on the
+    session once and a default timeout is applied to every call. With a
+    ``TokenProvider`` the token is taken from it on every call instead, so it
+    is refreshed before expiry and once more if the API answers 401.
+    """
+
+    def __init__(self, token=None, timeout=None, pool_size=None, token_provider=None):
+        load_dotenv()
+
+        self.timeout = timeout if timeout is not None else float(os.getenv("API_TIMEOUT", DEFAULT_TIMEOUT))
+        pool_size = pool_size if pool_size is not None else int(os.getenv("API_POOL_SIZE", DEFAULT_POOL_SIZE))
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.token_provider = token_provider
+
+        if token:
+            self.set_token(token)
+
+    def set_token(self, token):
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def set_token_provider(self, token_provider):
+        self.token_provider = token_provider
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = self._send(method, url, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            metrics.observe("api_request_duration_seconds", time.perf_counter() - start, method=method)
+            metrics.inc("api_requests_total", method=method, status=status)
+
+    def _send(self, method, url, **kwargs):
+        if self.token_provider is None:
+            return self.session.request(method, url, **kwargs)
+
+        token = self.token_provider.get_token()
+        response = self._authorized_request(token, method, url, **kwargs)
+        if response.status_code == 401:
+            self.token_provider.invalidate(token)
+            response = self._authorized_request(self.token_provider.get_token(), method, url, **kwargs)
+        return response
+
+    def _authorized_request(self, token, method, url, headers=None, **kwargs):
+        headers = dict(headers or {})
+        headers["Authorization"] = f"Bearer {token}"
+        return self.session.request(method, url, headers=headers, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
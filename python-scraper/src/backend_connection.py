@@ -1,12 +1,18 @@
-import json
 import os
 import requests
-import time
 from datetime import datetime
 from dotenv import load_dotenv
-import bcrypt
 from src.exceptions import EnvironmentVariableError
 from src.load_env import load_environment_variables
+from src.data_handling import read_records_jsonl
+from src.models import subject_api_name
+from src.api_client import ApiClient
+from src.token_provider import TokenProvider
+from src.upload_engine import UploadResult, run_uploads, get_upload_concurrency, get_upload_limit
+from src.provisioning import RosterError, load_roster, provision_users
+from src.metrics import metrics
+from src.sync import get_sync_mode, deletes_enabled, normalize_existing, olympiad_key, plan_sync, print_sync_plan
+from src.upload_journal import UploadJournal, get_upload_journal_path, idempotency_key
 
 
 def load_environment():
@@ -34,40 +40,30 @@ def get_api_endpoints():
     }
 
 
-def authenticate():
-    login_url = os.getenv("LOGIN_URL")
-    username = os.getenv("USERNAME")
-    password = os.getenv("PASSWORD")
-
-    payload = {
-        "usernameOrEmail": username,
-        "Password": password
-    }
-
-    for attempt in range(5):
-        try:
-            response = requests.post(login_url, json=payload)
-            response.raise_for_status()
-            token = response.json().get("token")
-            if not token:
-                raise ValueError("Authentication failed: No token returned.")
-            return token
-        except requests.RequestException as e:
-            print(f"Authentication failed, retrying... ({attempt + 1}/5): {e}")
-            time.sleep(5)
-
-    raise RuntimeError("Authentication failed after multiple attempts.")
+def authenticate(client):
+    """Attach a cached, self-refreshing login token to ``client``."""
+    token_provider = TokenProvider(
+        os.getenv("LOGIN_URL"),
+        os.getenv("USERNAME"),
+        os.getenv("PASSWORD"),
+        # Log in through the pooled session directly, bypassing the provider itself
+        post=lambda url, **kwargs: client.session.post(url, timeout=client.timeout, **kwargs),
+    )
+    token = token_provider.get_token()
+    client.set_token_provider(token_provider)
+    return token
 
 
 def hash_password(password: str):
+    import bcrypt
+
     salt = bcrypt.gensalt()
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
 
-def send_to_endpoint(api_endpoint, token, payload):
-    headers = {"Authorization": f"Bearer {token}"}
+def send_to_endpoint(client, api_endpoint, payload):
     try:
-        response = requests.post(api_endpoint, json=payload, headers=headers)
+        response = client.post(api_endpoint, json=payload)
         response.raise_for_status()
         print(f"Successfully sent: {payload}")
 
@@ -76,10 +72,9 @@ def send_to_endpoint(api_endpoint, token, payload):
         print(f"Error sending payload: {e}")
         return str(e)
 
-def fetch_all_users(api_endpoint, token):
-    headers = {"Authorization": f"Bearer {token}"}
+def fetch_all_users(client, api_endpoint):
     try:
-        response = requests.get(api_endpoint, headers=headers)
+        response = client.get(api_endpoint)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
@@ -87,8 +82,53 @@ def fetch_all_users(api_endpoint, token):
         return str(e)
 
 
-def assign_role_to_user(api_endpoint, token, user_id, role_id=2):
-    headers = {"Authorization": f"Bearer {token}"}
+def fetch_all_olympiads(client, api_endpoint):
+    try:
+        response = client.get(api_endpoint)
+        response.raise_for_status()
+        return response.json()
+    except requests.RequestException as e:
+        print(f"Error fetching olympiads: {e}")
+        return None
+
+
+def fetch_academic_year_ids(client, api_endpoint):
+    """Map ``(start_year, end_year)`` to the AcademicYearId the API stores for it."""
+    try:
+        response = client.get(api_endpoint)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Error fetching academic years: {e}")
+        return None
+
+    return {(year["startYear"], year["endYear"]): year["academicYearId"] for year in response.json()}
+
+
+def update_on_endpoint(client, api_endpoint, resource_id, payload):
+    try:
+        response = client.put(f"{api_endpoint}/{resource_id}", json=payload)
+        response.raise_for_status()
+        print(f"Successfully updated: {payload}")
+
+        return None
+    except requests.RequestException as e:
+        print(f"Error updating payload: {e}")
+        return str(e)
+
+
+def delete_on_endpoint(client, api_endpoint, resource_id):
+    try:
+        response = client.delete(f"{api_endpoint}/{resource_id}")
+        response.raise_for_status()
+        print(f"Successfully deleted: {resource_id}")
+
+        return None
+    except requests.RequestException as e:
+        print(f"Error deleting resource {resource_id}: {e}")
+        return str(e)
+
+
+def assign_role_to_user(client, api_endpoint, user_id, role_id=2):
     assigned_at = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
     payload = {
         "UserId": user_id,
@@ -96,175 +136,255 @@ def assign_role_to_user(api_endpoint, token, user_id, role_id=2):
         "AssignedAt": assigned_at
     }
     try:
-        response = requests.post(api_endpoint, json=payload, headers=headers)
+        response = client.post(api_endpoint, json=payload)
         response.raise_for_status()
         print(f"Role ID {role_id} successfully assigned to User ID {user_id}")
+        return None
     except requests.RequestException as e:
         print(f"Error assigning role: {e}")
+        return str(e)
 
 
-def request_password_reset_for_user(api_endpoint, token, email_or_username):
+def request_password_reset_for_user(client, api_endpoint, email_or_username):
     payload = {"UsernameOrEmail": email_or_username}
-    return send_to_endpoint(f"{api_endpoint}", token, payload)
+    return send_to_endpoint(client, f"{api_endpoint}", payload)
 
 
-def process_and_send_data():
-    load_environment()
+def load_olympiad_records():
     _, _, _, OUTPUT_JSON_PATH = load_environment_variables()
 
     if not os.path.exists(OUTPUT_JSON_PATH):
         raise FileNotFoundError(f"File not found: {OUTPUT_JSON_PATH}")
 
-    with open(OUTPUT_JSON_PATH, "r", encoding="utf-8") as file:
-        data = json.load(file)
+    return read_records_jsonl(OUTPUT_JSON_PATH)
+
+
+def build_olympiad_payloads(records, academic_year):
+    """Yield ``(payload, olympiad)`` for every day of every ``OlympiadRecord``.
+
+    This is the only place records become API dicts. ``olympiad`` carries
+    the raw subject/ring/date/class values used when reporting upload errors.
+    """
+    for record in records:
+        subject = subject_api_name(record.subject)
+        start_time = record.start_time.strftime("%H:%M:%S") if record.start_time else None
+
+        for day in record.days():
+            formatted_date = day.isoformat()
+
+            payload = {
+                "Subject": subject,
+                "Description": "none",
+                "DateOfOlympiad": formatted_date,
+                "Round": record.ring.api_name,
+                "Location": "Bulgaria",
+                "AcademicYearId": academic_year,
+                "ClassNumber": record.class_number,
+            }
+            if start_time:
+                payload["StartTime"] = f"{formatted_date}T{start_time}"
+
+            yield payload, {
+                "subject": str(record.subject),
+                "ring": str(record.ring),
+                "date": day.strftime("%d.%m.%Y"),
+                "class": record.class_number,
+            }
+
+
+def process_and_send_data(records=None):
+    load_environment()
+
+    if records is None:
+        records = load_olympiad_records()
 
     endpoints = get_api_endpoints()
     academic_year = calculate_academic_year()
-    token = authenticate()
-
-    user1 = {
-        "Name": "Borislav Boqnov Milanov",
-        "DateOfBirth": "2006-05-30",
-        "AcademicYearId": int(academic_year),
-        "Username": "bob4o",
-        "Email": "borislav.b.milanov.2020@elsys-bg.org",
-        "Password": "somepassword123",
-        "Gender": "Male",
-        "EmailVerified": False
-    }
+    with ApiClient(pool_size=get_upload_concurrency()) as client:
+        return upload_data(client, records, endpoints, academic_year)
 
-    user2 = {
-        "Name": "Milan Penkov Borislavov",
-        "DateOfBirth": "2006-06-30",
-        "AcademicYearId": int(academic_year),
-        "Username": "bob4oto",
-        "Email": "bobi06bobi@gmail.com",
-        "Password": "somepassword123",
-        "Gender": "Male",
-        "EmailVerified": False
-    }
-    
-    errors = []
-    reset_errors = []
-
-    for user in [user1, user2]:
-        error = send_to_endpoint(endpoints["users_endpoint"], token, user)
-        if error:
-            errors.append({"user": user["Name"], "error": error})
-
-    if errors:
-        print("\nErrors during user creation:")
-        for err in errors:
-            print(f"User: {err['user']}, Error: {err['error']}")
+
+def upload_data(client, records, endpoints, academic_year):
+    authenticate(client)
+
+    roster_path = os.getenv("USER_ROSTER_PATH")
+    if get_sync_mode() == "dry-run":
+        # Provisioning creates users and sends them emails, a dry run must not write anything
+        print("Dry run. Skipping user provisioning.")
+    elif roster_path:
+        try:
+            provision_users(client, load_roster(roster_path), endpoints, academic_year, get_upload_concurrency())
+        except RosterError as e:
+            print(f"Skipping user provisioning: {e}")
     else:
-        print("\nUsers created successfully.")
+        print("USER_ROSTER_PATH is not set. Skipping user provisioning.")
 
+    return upload_olympiad_data(client, endpoints["olympiad_endpoint"], records, academic_year)
 
-    users = fetch_all_users(endpoints["users_endpoint"], token)
-    if not users:
-        print("Failed to fetch users. Cannot assign roles.")
-        return        
 
-    print(users)
+def upload_olympiad_data(client, olympiad_endpoint, records, academic_year):
+    """Upload or sync the records; returns the ``UploadResult``, or ``None`` when nothing was written."""
+    payloads = build_olympiad_payloads(records, academic_year)
+    sync_mode = get_sync_mode()
+    if sync_mode == "post":
+        return upload_olympiads(client, olympiad_endpoint, payloads)
+    return sync_olympiads(client, olympiad_endpoint, payloads, dry_run=sync_mode == "dry-run")
 
-    for user in [user1, user2]:
-        matching_user = next(
-                (u for u in users if u.get("email", "").strip().lower() == user["Email"].strip().lower()), 
-                None
+
+def print_olympiad_errors(olympiad_errors):
+    if olympiad_errors:
+        print("\nErrors occurred during olympiad upload:")
+        for err in olympiad_errors:
+            print(
+                f"Subject: {err['subject']}, Ring: {err['ring']}, Date: {err['date']}, Class: {err['class']}, Error: {err['error']}"
             )
-        if not matching_user:
-            print(f"User {user['Name']} not found in the system.")
-            continue
-        try:
-            assign_role_to_user(endpoints["role_assignment_endpoint"], token, matching_user["userId"])
-            print(f"Sending password reset request for: {user['Email']}")
-            
-            reset_error = request_password_reset_for_user(endpoints["rpc_endpoint"], token, user["Email"])
-            if reset_error:
-                reset_errors.append({"user": user["Name"], "error": reset_error})
-        except Exception as e:
-            reset_errors.append({"user": user["Name"], "error": str(e)})
-
-    if reset_errors:
-        print("\nErrors during password reset requests:")
-        for err in reset_errors:
-            print(f"User: {err['user']}, Error: {err['error']}")
     else:
-        print("\nPassword reset requests sent successfully.")
+        print("\nAll data uploaded successfully!")
 
-    if errors:
-        print("\nErrors occurred during user creation:")
-        for err in errors:
-            print(f"User: {err['user']}, Error: {err['error']}")
-    else:
-        print("\nAll users created and roles assigned successfully.")
-
-    olympiad_count = 0
-    olympiad_errors = []
-    for subject, rings in data.items():
-        for ring, ring_data in rings.items():
-            classes = ring_data.get("class", [])
-            dates = ring_data.get("dates", [])
-            time = ring_data.get("time", None)
-
-            if isinstance(dates, list):
-                dates = [date.strip() for date in dates[0].split(",")]
-
-            for class_num in classes:
-                for date in dates:
-                    if olympiad_count >= 10:
-                        print("\nLimit of 10 Olympiads reached. Stopping further uploads.")
-                        if olympiad_errors:
-                            print("\nErrors occurred during olympiad upload:")
-                            for err in olympiad_errors:
-                                print(
-                                    f"Subject: {err['subject']}, Ring: {err['ring']}, Date: {err['date']}, Class: {err['class']}, Error: {err['error']}"
-                                )
-                        else:
-                            print("\nAll data uploaded successfully!")
-                        
-                        return 0
-                    try:
-                        date_obj = datetime.strptime(date, "%d.%m.%Y")
-                        formatted_date = date_obj.strftime("%Y-%m-%d")
-                    except ValueError:
-                        print(f"Error parsing date: {date}")
-                        continue
-
-                    start_time = None
-                    if time:
-                        try:
-                            time = time.replace(" o'clock", "")
-                            time_obj = datetime.strptime(time, "%H:%M")
-                            start_time = f"{formatted_date}T{time_obj.strftime('%H:%M:%S')}"
-                        except ValueError:
-                            print(f"Error parsing time: {time}")
-                            continue
-
-                    payload = {
-                        "Subject": subject.replace("_", " ").title(),
-                        "Description": "none",
-                        "DateOfOlympiad": formatted_date,
-                        "Round": ring.replace("_", " ").title(),
-                        "Location": "Bulgaria",
-                        "StartTime": start_time,
-                        "AcademicYearId": academic_year,
-                        "ClassNumber": class_num,
-                    }
-
-                    if not start_time:
-                        del payload["StartTime"]
-
-                    error = send_to_endpoint(endpoints["olympiad_endpoint"], token, payload)
-                    if error:
-                        olympiad_errors.append({
-                            "subject": subject,
-                            "ring": ring,
-                            "date": date,
-                            "class": class_num,
-                            "error": error
-                        })
-                    else:
-                        olympiad_count += 1
 
+def count_olympiad_writes(operation, result):
+    metrics.inc("olympiad_writes_total", result.sent, operation=operation)
+    metrics.inc("olympiad_write_errors_total", len(result.errors), operation=operation)
+
+
+def upload_olympiads(client, olympiad_endpoint, payloads):
+    """POST every payload, skipping the ones an earlier run already uploaded.
+
+    Results are kept in the upload journal (``UPLOAD_JOURNAL_PATH``), so a
+    run that died halfway resumes where it stopped and retries only the
+    olympiads that failed.
+    """
+    limit = get_upload_limit()
+    journal_path = get_upload_journal_path()
+    journal = UploadJournal(journal_path) if journal_path else None
+    completed = failed = set()
+    skipped = 0
+    retried = []
+
+    def key_of(payload):
+        return idempotency_key(olympiad_endpoint, olympiad_key(payload))
+
+    def remaining():
+        nonlocal skipped
+        for payload, olympiad in payloads:
+            if completed and key_of(payload) in completed:
+                skipped += 1
+                continue
+            yield payload, olympiad
+
+    def send(payload):
+        if failed and key_of(payload) in failed:
+            retried.append(payload)
+        return send_to_endpoint(client, olympiad_endpoint, payload)
+
+    try:
+        if journal:
+            completed, failed = journal.completed_keys(), journal.failed_keys()
+            send = journal.journaled(send, key_of)
+
+        result = run_uploads(send, remaining(), max_workers=get_upload_concurrency(), limit=limit)
+    finally:
+        if journal:
+            journal.close()
+
+    count_olympiad_writes("insert", result)
+    if skipped:
+        metrics.inc("olympiad_uploads_skipped_total", skipped)
+        print(f"\nSkipped {skipped} olympiads that {journal_path} records as uploaded. "
+              f"Delete it to upload them again, e.g. after the API data was reset.")
+    if retried:
+        print(f"\nRetried {len(retried)} olympiads that failed in an earlier run.")
+
+    if result.limit_reached:
+        print(f"\nLimit of {limit} Olympiads reached. Stopping further uploads.")
+
+    print_olympiad_errors(result.errors)
+    return result
+
+
+def forget_deleted_olympiads(olympiad_endpoint, existing, deleted_ids):
+    """Drop the journal entries of olympiads no longer on the API, so post mode uploads them again.
+
+    Keys that still have another olympiad left, e.g. after removing a
+    duplicate, stay in the journal.
+    """
+    journal_path = get_upload_journal_path()
+    if journal_path is None or not deleted_ids:
+        return
+
+    deleted_ids = set(deleted_ids)
+    remaining = {}
+    for olympiad in existing:
+        olympiad_id, payload = normalize_existing(olympiad)
+        key = olympiad_key(payload)
+        remaining[key] = remaining.get(key, 0) + (olympiad_id not in deleted_ids)
+
+    with UploadJournal(journal_path) as journal:
+        journal.forget(idempotency_key(olympiad_endpoint, key) for key, count in remaining.items() if not count)
+
+
+def sync_olympiads(client, olympiad_endpoint, payloads, dry_run=False):
+    existing = fetch_all_olympiads(client, olympiad_endpoint)
+    if existing is None:
+        print("Failed to fetch olympiads. Cannot sync.")
+        return None
+
+    plan = plan_sync(payloads, existing)
+    print_sync_plan(plan, dry_run=dry_run)
+    if dry_run:
+        return None
 
+    max_workers = get_upload_concurrency()
+    limit = get_upload_limit()
+
+    inserts = run_uploads(
+        lambda payload: send_to_endpoint(client, olympiad_endpoint, payload),
+        plan.inserts,
+        max_workers=max_workers,
+        limit=limit,
+    )
+    updates = run_uploads(
+        lambda update: update_on_endpoint(client, olympiad_endpoint, update[0], update[1]),
+        (((olympiad_id, payload), olympiad) for olympiad_id, payload, olympiad in plan.updates),
+        max_workers=max_workers,
+    )
+    count_olympiad_writes("insert", inserts)
+    count_olympiad_writes("update", updates)
+
+    errors = inserts.errors + updates.errors
+    deleted = 0
+
+    if plan.deletes and not deletes_enabled():
+        print(f"\nSkipping {len(plan.deletes)} deletes. Set OLYMPIAD_SYNC_DELETE=true to apply them.")
+    elif plan.deletes:
+        print(f"\nDeleting {len(plan.deletes)} olympiads together with their student enrollments.")
+        deleted_ids = []
+
+        def delete(olympiad_id):
+            error = delete_on_endpoint(client, olympiad_endpoint, olympiad_id)
+            if not error:
+                deleted_ids.append(olympiad_id)
+            return error
+
+        deletes = run_uploads(
+            delete,
+            ((olympiad_id, {
+                "subject": payload["Subject"],
+                "ring": payload["Round"],
+                "date": payload["DateOfOlympiad"],
+                "class": payload["ClassNumber"],
+            }) for olympiad_id, payload in plan.deletes),
+            max_workers=max_workers,
+        )
+        count_olympiad_writes("delete", deletes)
+        forget_deleted_olympiads(olympiad_endpoint, existing, deleted_ids)
+        errors += deletes.errors
+        deleted = deletes.sent
+
+    print(f"\nSync finished: {inserts.sent} inserted, {updates.sent} updated, {deleted} deleted.")
+    print_olympiad_errors(errors)
+    if inserts.limit_reached:
+        print(f"\nLimit of {limit} Olympiads reached: {len(plan.inserts) - limit} inserts were not sent "
+              f"and the API still differs from the bulletin. Raise OLYMPIAD_UPLOAD_LIMIT to finish the sync.")
+
+    return UploadResult(inserts.sent + updates.sent + deleted, errors, inserts.limit_reached)
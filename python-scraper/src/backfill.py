@@ -0,0 +1,130 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+from src.scraper import download_pdf
+from src.data_handling import tee_records_jsonl
+from src.parse_cache import ParseCache, parse_pdf
+from src.api_client import ApiClient
+from src.backend_connection import (
+    load_environment,
+    check_required_env_vars,
+    authenticate,
+    send_to_endpoint,
+    fetch_academic_year_ids,
+    upload_olympiad_data,
+)
+from src.upload_engine import get_upload_concurrency
+from src.metrics import metrics
+
+DEFAULT_BACKFILL_WORKERS = 4
+DEFAULT_BACKFILL_OUTPUT_DIR = os.path.join("files", "backfill")
+
+
+def get_backfill_workers():
+    load_dotenv()
+    return max(1, int(os.getenv("BACKFILL_WORKERS", DEFAULT_BACKFILL_WORKERS)))
+
+
+def fetch_years(start_years, cache=None, max_workers=None, archive=True):
+    """Download the bulletins of several academic years concurrently.
+
+    Yields ``(start_year, DownloadedPdf)`` as downloads finish; years without
+    a new bulletin yield ``None`` and failed years are reported and skipped.
+    With ``archive=False`` the bulletins are not archived to Supabase.
+    """
+    max_workers = max_workers or get_backfill_workers()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                download_pdf, write_to_disk=False, cache=cache, start_year=start_year, archive=archive
+            ): start_year
+            for start_year in start_years
+        }
+        for future in as_completed(futures):
+            start_year = futures[future]
+            try:
+                yield start_year, future.result()
+            except Exception as e:
+                print(f"Failed to download bulletin for {start_year}-{start_year + 1}: {e}")
+
+
+def resolve_academic_year_id(client, academic_year_endpoint, year_ids, start_year, end_year):
+    """Return the AcademicYearId of ``start_year-end_year``, creating the year when it is missing."""
+    if (start_year, end_year) not in year_ids:
+        send_to_endpoint(client, academic_year_endpoint, {"StartYear": start_year, "EndYear": end_year})
+        # A failed refetch leaves the year unknown, so it is skipped rather than created again
+        year_ids.update(fetch_academic_year_ids(client, academic_year_endpoint) or {})
+    return year_ids.get((start_year, end_year))
+
+
+def backfill_years(first_year, last_year, cache=None, max_workers=None, output_dir=None, upload=True):
+    """Download, parse and upload every bulletin from ``first_year`` to ``last_year``.
+
+    Years are start years of an academic year (2021 is ``ol-2021-2022``).
+    Each year's records are streamed into the uploader and written to
+    ``<output_dir>/<start>-<end>.jsonl`` on the way, so no year is held in
+    memory. Returns ``{(start_year, end_year): jsonl_path}`` in year order.
+
+    With ``upload=False`` the bulletins are not archived to Supabase either.
+    """
+    load_dotenv()
+    output_dir = output_dir or os.getenv("BACKFILL_OUTPUT_DIR", DEFAULT_BACKFILL_OUTPUT_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+
+    client = None
+    if upload:
+        load_environment()
+        check_required_env_vars(["ACADEMIC_YEAR_ENDPOINT"])
+        academic_year_endpoint = os.getenv("ACADEMIC_YEAR_ENDPOINT")
+        olympiad_endpoint = os.getenv("OLYMPIAD_ENDPOINT")
+
+        # One authenticated session for every year
+        client = ApiClient(pool_size=get_upload_concurrency())
+        authenticate(client)
+        year_ids = fetch_academic_year_ids(client, academic_year_endpoint)
+        if year_ids is None:
+            # Without the existing years every year would be created again
+            client.close()
+            raise RuntimeError("Could not fetch the academic years. Not uploading the backfill.")
+
+    parse_cache = ParseCache()
+    written = {}
+    try:
+        for start_year, downloaded in fetch_years(range(first_year, last_year + 1), cache, max_workers, archive=upload):
+            if downloaded is None:
+                print(f"No new bulletin for {start_year}-{start_year + 1}.")
+                continue
+
+            year = (downloaded.start_year, downloaded.end_year)
+            output_path = os.path.join(output_dir, f"{year[0]}-{year[1]}.jsonl")
+
+            # Parsing happens here while the remaining years are still downloading
+            _, _, records = parse_pdf(downloaded.content, parse_cache)
+            records = tee_records_jsonl(records, output_path)
+
+            if client:
+                result = None
+                academic_year = resolve_academic_year_id(client, academic_year_endpoint, year_ids, *year)
+                if academic_year is None:
+                    print(f"Academic year {year[0]}-{year[1]} not found in the system. Skipping upload.")
+                else:
+                    print(f"\nUploading olympiads for {year[0]}-{year[1]}")
+                    with metrics.stage("upload", academic_year=f"{year[0]}-{year[1]}"):
+                        result = upload_olympiad_data(client, olympiad_endpoint, records, academic_year)
+
+                if cache is not None and not (result is not None and result.complete):
+                    # Forget the download so the next run fetches and uploads this year again
+                    cache.forget(downloaded.url)
+                    print(f"Upload for {year[0]}-{year[1]} incomplete. It will be processed again on the next run.")
+
+            # Finish the file and the cache entry even when the upload stopped early, e.g. at the upload limit
+            for _ in records:
+                pass
+            written[year] = output_path
+    finally:
+        if client:
+            client.close()
+
+    return dict(sorted(written.items()))
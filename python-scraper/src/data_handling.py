@@ -1,111 +1,179 @@
 import re
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import date, time, timedelta
 from dotenv import load_dotenv
 
 from src.text_processing import convert_roman_to_arabic, translation_dict, competition_levels
 from src.load_env import load_environment_variables
+from src.models import OlympiadRecord, Round, subject_from_slug
+
+# Resolved once, so every record of a subject or round shares the same enum member
+SUBJECTS_BY_NAME = {name: subject_from_slug(slug) for name, slug in translation_dict.items()}
+ROUNDS_BY_HEADER = {header: Round(slug) for header, slug in competition_levels.items()}
+
+START_TIME_PATTERN = re.compile(r'НАЧАЛО\s+(\d{1,2}):(\d{2})\s*Ч\.?')
+COMPACT_DATE_RANGE_PATTERN = re.compile(r'(\d{2})\.(\d{2})\s*-\s*(\d{2})\.(\d{2})\s*(\d{4})')
+DATE_PATTERN = re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})')
+
+
+def parse_classes(classes_str):
+    classes_str = convert_roman_to_arabic(classes_str.replace("И", "").strip())
+    classes = []
+
+    class_parts = re.split(r'[,\s]+', classes_str)
+    for part in class_parts:
+        part = part.strip()
+        if "-" in part and not is_date_range(part):
+            try:
+                start, end = map(int, part.split("-"))
+                classes.extend(range(start, end + 1))
+            except ValueError:
+                print(f"Warning: Unable to process class range '{part}'.")
+        else:
+            try:
+                classes.append(int(part))
+            except ValueError:
+                print(f"Warning: Unable to process class part '{part}'.")
+
+    return sorted(set(classes))
+
+
+def parse_date_intervals(date_str):
+    """Return the days of a cleaned bulletin date cell as ``(start, end)`` intervals and the start time.
+
+    Ranges have usually been expanded to a comma separated list by
+    ``expand_ranges_in_text`` already; consecutive days are merged back into
+    one interval, so a multi-day round is a single record.
+    """
+    start_time = None
+    time_match = START_TIME_PATTERN.search(date_str)
+    if time_match:
+        try:
+            start_time = time(int(time_match.group(1)), int(time_match.group(2)))
+        except ValueError:
+            print(f"Error parsing time: {time_match.group(0)}")
+        date_str = date_str[:time_match.start()].strip()
 
+    range_match = COMPACT_DATE_RANGE_PATTERN.search(date_str)
+    if range_match:
+        day1, month1, day2, month2, year = map(int, range_match.groups())
+        try:
+            start_date, end_date = date(year, month1, day1), date(year, month2, day2)
+        except ValueError:
+            print(f"Error parsing date range: {range_match.group(0)}")
+            return [], start_time
+        return ([(start_date, end_date)] if start_date <= end_date else []), start_time
+
+    intervals = []
+    for part in date_str.split(","):
+        part = part.strip()
+        match = DATE_PATTERN.fullmatch(part)
+        try:
+            if not match:
+                raise ValueError(part)
+            day = date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+        except ValueError:
+            print(f"Error parsing date: {part}")
+            continue
+
+        if intervals and intervals[-1][1] + timedelta(days=1) == day:
+            intervals[-1] = (intervals[-1][0], day)
+        else:
+            intervals.append((day, day))
+
+    return intervals, start_time
 
-def extract_and_process_text():
-    load_dotenv()
-    _, _, TXT_PATH, OUTPUT_JSON_PATH = load_environment_variables()
 
-    olympiad_data = {}
+def iter_olympiad_records(rows):
+    """Yield one ``OlympiadRecord`` per class and date interval of every bulletin row.
 
+    ``rows`` are the tab-split records produced by ``tables_to_rows`` (or read
+    back from the TXT dump). Nothing is accumulated, so records can be
+    uploaded or written out while later rows are still being parsed.
+    """
     current_competition_level = None
 
-    with open(TXT_PATH, 'r', encoding='utf-8') as file:
-        for line in file:
-            parts = line.split("\t")
-            if len(parts) == 1:
-                competition_level = parts[0].strip()
-                if competition_level in competition_levels:
-                    current_competition_level = competition_levels[competition_level]
-                continue
-
-            if len(parts) < 4 or current_competition_level is None:
-                continue
-
-            subject = parts[0].strip()
-            classes_str = parts[1].strip()
-            date_str = clean_date(parts[-1].strip())
-
-            translated_subject = translation_dict.get(subject, subject)
-            classes_str = convert_roman_to_arabic(classes_str.replace("И", "").strip())
-            classes = []
-
-            class_parts = re.split(r'[,\s]+', classes_str)
-            for part in class_parts:
-                part = part.strip()
-                if "-" in part and not is_date_range(part):
-                    try:
-                        start, end = map(int, part.split("-"))
-                        classes.extend(range(start, end + 1))
-                    except ValueError:
-                        print(f"Warning: Unable to process class range '{part}'.")
-                else:
-                    try:
-                        classes.append(int(part))
-                    except ValueError:
-                        print(f"Warning: Unable to process class part '{part}'.")
-
-            classes = sorted(set(classes))
-
-            if translated_subject not in olympiad_data:
-                olympiad_data[translated_subject] = {}
-
-            dates, time = extract_dates_and_time(date_str)
-
-            olympiad_data[translated_subject][current_competition_level] = {
-                "class": classes,
-                "dates": dates
-            }
-            if time:
-                olympiad_data[translated_subject][current_competition_level]["time"] = time
-
-    with open(OUTPUT_JSON_PATH, 'w', encoding='utf-8') as json_file:
-        json.dump(olympiad_data, json_file, ensure_ascii=False, indent=4)
-    print(f"JSON file saved successfully: {OUTPUT_JSON_PATH}")
+    for parts in rows:
+        if len(parts) == 1:
+            competition_level = parts[0].strip()
+            if competition_level in ROUNDS_BY_HEADER:
+                current_competition_level = ROUNDS_BY_HEADER[competition_level]
+            continue
 
+        if len(parts) < 4 or current_competition_level is None:
+            continue
 
-def clean_date(date_str):
-    return date_str.replace("ДО", "").replace("Г.", "").strip()
+        subject = parts[0].strip()
+        translated_subject = SUBJECTS_BY_NAME.get(subject) or subject_from_slug(subject)
 
+        classes = parse_classes(parts[1].strip())
+        intervals, start_time = parse_date_intervals(clean_date(parts[-1].strip()))
 
-def extract_dates_and_time(date_str):
-    # For time
-    time_match = re.search(r'НАЧАЛО\s+(\d{1,2}:\d{2})\s*Ч\.?', date_str)
-    time = time_match.group(1) + " o'clock" if time_match else None
+        for class_number in classes:
+            for start_date, end_date in intervals:
+                yield OlympiadRecord(
+                    translated_subject, current_competition_level, class_number, start_date, end_date, start_time
+                )
 
-    if time:
-        date_str = date_str[:time_match.start()].strip()
 
-    # For date range
-    date_range_match = re.search(r'(\d{2}\.\d{2})\s*-\s*(\d{2}\.\d{2})\s*(\d{4})', date_str)
-
-    if date_range_match:
-        start_date_str = date_range_match.group(1) + "." + date_range_match.group(3)
-        end_date_str = date_range_match.group(2) + "." + date_range_match.group(3)
-        start_date = datetime.strptime(start_date_str, '%d.%m.%Y')
-        end_date = datetime.strptime(end_date_str, '%d.%m.%Y')
-
-        # Generate all dates in the range
-        dates = []
-        current_date = start_date
-        while current_date <= end_date:
-            dates.append(current_date.strftime('%d.%m.%Y'))
-            current_date += timedelta(days=1)
-    else:
-        # Handle single date or non-matching date formats
-        try:
-            single_date = datetime.strptime(date_str, '%d.%m.%Y')
-            dates = [single_date.strftime('%d.%m.%Y')]
-        except ValueError:
-            dates = [date_str]
+def record_to_json(record):
+    return {
+        "subject": str(record.subject),
+        "ring": str(record.ring),
+        "class": record.class_number,
+        "start_date": record.start_date.isoformat(),
+        "end_date": record.end_date.isoformat(),
+        "time": record.start_time.strftime("%H:%M") if record.start_time else None,
+    }
 
-    return dates, time
+
+def record_from_json(values):
+    # Files written before date intervals have a single "date"
+    start_date = date.fromisoformat(values.get("start_date") or values["date"])
+    return OlympiadRecord(
+        subject_from_slug(values["subject"]),
+        Round(values["ring"]),
+        int(values["class"]),
+        start_date,
+        date.fromisoformat(values["end_date"]) if values.get("end_date") else start_date,
+        time.fromisoformat(values["time"]) if values.get("time") else None,
+    )
+
+
+def tee_records_jsonl(records, output_jsonl_path):
+    """Pass ``records`` through while writing each one as a JSON line."""
+    count = 0
+    with open(output_jsonl_path, 'w', encoding='utf-8') as jsonl_file:
+        for record in records:
+            jsonl_file.write(json.dumps(record_to_json(record), ensure_ascii=False) + '\n')
+            count += 1
+            yield record
+    print(f"JSON Lines file saved successfully: {output_jsonl_path} ({count} records)")
+
+
+def write_records_jsonl(records, output_jsonl_path):
+    for _ in tee_records_jsonl(records, output_jsonl_path):
+        pass
+
+
+def read_records_jsonl(jsonl_path):
+    with open(jsonl_path, 'r', encoding='utf-8') as jsonl_file:
+        for line in jsonl_file:
+            if line.strip():
+                yield record_from_json(json.loads(line))
+
+
+def extract_and_process_text():
+    load_dotenv()
+    _, _, TXT_PATH, OUTPUT_JSON_PATH = load_environment_variables()
+
+    with open(TXT_PATH, 'r', encoding='utf-8') as file:
+        write_records_jsonl(iter_olympiad_records(line.rstrip('\n').split("\t") for line in file), OUTPUT_JSON_PATH)
+
+
+def clean_date(date_str):
+    return date_str.replace("ДО", "").replace("Г.", "").strip()
 
 
 def is_date_range(text):
@@ -0,0 +1,21 @@
+def export_tables_to_docx(tables, output_word_path):
+    """Render already extracted tables into a Word document.
+
+    python-docx is imported here so runs that don't ask for the export never
+    load it.
+    """
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading('Extracted Tables', 0)
+
+    for table in tables:
+        doc.add_paragraph(table.header)
+
+        table_in_doc = doc.add_table(rows=1 + len(table.rows), cols=len(table.columns))
+        for row_cells, values in zip(table_in_doc.rows, [table.columns] + table.rows):
+            for cell, value in zip(row_cells.cells, values):
+                cell.text = value
+
+    doc.save(output_word_path)
+    print(f"Word document saved successfully: {output_word_path}")
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+from dotenv import load_dotenv
+
+DEFAULT_CACHE_PATH = os.path.join("files", ".http_cache.json")
+
+
+def sha256_hex(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class HttpCache:
+    """On-disk store of response validators and content hashes per URL.
+
+    Entries hold ``etag``, ``last_modified``, ``sha256`` and any extra values
+    a caller wants to remember (e.g. the PDF link found on a year page).
+    Changes stay in memory until ``save`` is called, so a run that fails
+    halfway does not mark its download as already processed.
+    """
+
+    def __init__(self, path=None):
+        load_dotenv()
+        self.path = path or os.getenv("HTTP_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.entries = {}
+
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    self.entries = json.load(file)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable HTTP cache {self.path}: {e}")
+
+    def get(self, url):
+        return self.entries.get(url, {})
+
+    def conditional_headers(self, url):
+        entry = self.get(url)
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, response, **values):
+        entry = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        entry.update(values)
+        self.entries[url] = entry
+
+    def forget(self, url):
+        self.entries.pop(url, None)
+
+    def save(self, path=None):
+        """Write the entries to ``path`` (the cache file by default)."""
+        path = path or self.path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file, indent=4)
+        os.replace(tmp_path, path)
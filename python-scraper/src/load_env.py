@@ -15,3 +15,23 @@ def load_environment_variables():
         raise EnvironmentVariableError("One or more environment variables are missing.")
 
     return pdf_file_path, output_word_path, output_txt_path, output_json_path
+
+
+def debug_output_enabled():
+    load_dotenv()
+    return os.getenv('DEBUG_OUTPUT', '').strip().lower() in ('1', 'true', 'yes')
+
+
+def force_download_enabled():
+    load_dotenv()
+    return os.getenv('FORCE_DOWNLOAD', '').strip().lower() in ('1', 'true', 'yes')
+
+
+def docx_export_enabled():
+    load_dotenv()
+    return os.getenv('EXPORT_DOCX', '').strip().lower() in ('1', 'true', 'yes')
+
+
+def get_metrics_summary_dir():
+    load_dotenv()
+    return os.getenv('METRICS_SUMMARY_DIR', os.path.join('files', 'metrics'))
@@ -0,0 +1,190 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Upper bounds in seconds, from a cached API call up to a full bulletin extraction
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_key):
+    if not label_key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in label_key) + "}"
+
+
+def _format_value(value):
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+class Metrics:
+    """Counters, latency histograms and stage timings of one service process.
+
+    ``stage`` times a block and ``timed_iter`` the work done inside a lazy
+    stream; both feed the ``stage_duration_seconds`` histogram, count
+    failures in ``stage_errors_total`` and print one JSON log line per stage
+    unless ``METRICS_LOG_STAGES`` is off. Everything is kept in memory and
+    exported with ``render_prometheus`` or ``summary``.
+    """
+
+    def __init__(self, namespace, buckets=DEFAULT_BUCKETS, record_stages=True):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self.record_stages = record_stages
+        load_dotenv()
+        self.log_stages = os.getenv("METRICS_LOG_STAGES", "true").strip().lower() in ("1", "true", "yes")
+        self.started_at = time.time()
+
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._stages = []
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts (the last one is +Inf), sum and count
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][bisect.bisect_left(self.buckets, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def stage(self, name, **labels):
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self._finish_stage(name, time.perf_counter() - start, status, labels)
+
+    def timed_iter(self, name, iterable, **labels):
+        """Yield from ``iterable``, timing only the time spent producing items.
+
+        Meant for lazy pipelines, where a stage runs interleaved with its
+        consumer; the stage ends when the stream is exhausted or closed.
+        """
+        iterator = iter(iterable)
+        duration = 0.0
+        items = 0
+        status = "ok"
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    duration += time.perf_counter() - start
+                items += 1
+                yield item
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self._finish_stage(name, duration, status, {**labels, "items": items})
+
+    def _finish_stage(self, name, duration, status, labels):
+        metric_labels = {key: value for key, value in labels.items() if key != "items"}
+        self.observe("stage_duration_seconds", duration, stage=name, **metric_labels)
+        if status == "error":
+            self.inc("stage_errors_total", stage=name, **metric_labels)
+
+        entry = {"stage": name, "status": status, "duration_s": round(duration, 4), **labels}
+        if self.record_stages:
+            with self._lock:
+                self._stages.append(entry)
+        if self.log_stages:
+            print(json.dumps({"event": "stage", "service": self.namespace, **entry}, default=str), flush=True)
+
+    def render_prometheus(self):
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(buckets), total, count) for key, (buckets, total, count) in self._histograms.items()}
+
+        lines = [
+            f"# TYPE {self.namespace}_start_time_seconds gauge",
+            f"{self.namespace}_start_time_seconds {_format_value(self.started_at)}",
+        ]
+
+        for name in sorted({name for name, _ in counters}):
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            for (counter_name, label_key), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(f"{metric}{_format_labels(label_key)} {_format_value(value)}")
+
+        for name in sorted({name for name, _ in histograms}):
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for (histogram_name, label_key), (buckets, total, count) in sorted(histograms.items()):
+                if histogram_name != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), buckets):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{metric}_bucket{_format_labels(label_key + (('le', le),))} {cumulative}")
+                lines.append(f"{metric}_sum{_format_labels(label_key)} {_format_value(total)}")
+                lines.append(f"{metric}_count{_format_labels(label_key)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Return the stages, counters and histogram totals as a JSON-serializable dict."""
+        with self._lock:
+            counters = [
+                {"name": name, **dict(label_key), "value": value}
+                for (name, label_key), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {"name": name, **dict(label_key), "count": count, "sum": round(total, 4)}
+                for (name, label_key), (_, total, count) in sorted(self._histograms.items())
+            ]
+            stages = list(self._stages)
+
+        return {
+            "service": self.namespace,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "duration_s": round(time.time() - self.started_at, 3),
+            "stages": stages,
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def write_summary(self, directory):
+        """Write ``summary()`` to ``<directory>/<namespace>_<start time>.json`` and return the path."""
+        os.makedirs(directory, exist_ok=True)
+        started = datetime.fromtimestamp(self.started_at).strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(directory, f"{self.namespace}_{started}.json")
+        with open(path, "w", encoding="utf-8") as summary_file:
+            json.dump(self.summary(), summary_file, indent=2, default=str)
+        return path
+
+
+# The registry of this service
+metrics = Metrics("scraper")
@@ -0,0 +1,104 @@
+import sys
+from dataclasses import dataclass, field
+from datetime import date, time, timedelta
+from enum import Enum
+from typing import List, Optional, Union
+
+
+@dataclass
+class DownloadedPdf:
+    """Bulletin PDF fetched from the year page, kept in memory."""
+    content: bytes
+    filename: str
+    start_year: int
+    end_year: int
+    url: Optional[str] = None
+
+
+@dataclass
+class ExtractedTable:
+    """Table found on one bulletin page, with its competition level header."""
+    header: str
+    columns: List[str]
+    rows: List[List[str]] = field(default_factory=list)
+
+
+class Subject(str, Enum):
+    """Olympiad subjects known from the bulletins; values are the slugs used in the data files."""
+    KNOW_AND_CAN = "know_and_can"
+    MATH = "math"
+    BULGARIAN_LANGUAGE_AND_LITERATURE = "bulgarian_language_and_literature"
+    ENGLISH = "english"
+    GERMAN = "german"
+    SPANISH = "spanish"
+    ITALIAN = "italian"
+    RUSSIAN = "russian"
+    FRENCH = "french"
+    INFORMATICS = "informatics"
+    INFORMATION_TECHNOLOGIES = "information_technologies"
+    LINGUISTICS = "linguistics"
+    PHILOSOPHY = "philosophy"
+    HISTORY_AND_CIVILIZATIONS = "history_and_civilizations"
+    GEOGRAPHY_AND_ECONOMICS = "geography_and_economics"
+    CIVIC_EDUCATION = "civic_education"
+    PHYSICS = "physics"
+    ASTRONOMY = "astronomy"
+    CHEMISTRY_AND_ENVIRONMENTAL_PROTECTION = "chemistry_and_environmental_protection"
+    BIOLOGY_AND_HEALTH_EDUCATION = "biology_and_health_education"
+    TECHNICAL_DRAWING = "technical_drawing"
+
+    def __init__(self, slug):
+        # The name the OlympiadApi stores, computed once per member
+        self.api_name = slug.replace("_", " ").title()
+
+    def __str__(self):
+        return self.value
+
+
+class Round(str, Enum):
+    """Competition level of an olympiad round."""
+    DISTRICT = "district_ring"
+    REGIONAL = "regional_ring"
+    NATIONAL = "national_ring"
+
+    def __init__(self, slug):
+        self.api_name = slug.replace("_", " ").title()
+
+    def __str__(self):
+        return self.value
+
+
+def subject_from_slug(slug):
+    """Return the ``Subject`` for ``slug``; unknown subjects stay as (interned) text."""
+    try:
+        return Subject(slug)
+    except ValueError:
+        return sys.intern(slug)
+
+
+def subject_api_name(subject):
+    return subject.api_name if isinstance(subject, Subject) else subject.replace("_", " ").title()
+
+
+@dataclass(frozen=True)
+class OlympiadRecord:
+    """One olympiad round for one class, held on every day from ``start_date`` to ``end_date``.
+
+    Multi-day rounds stay a single record; ``days()`` expands them where one
+    value per day is needed. Slotted, so large and multi-year runs keep no
+    per-record ``__dict__``.
+    """
+    __slots__ = ("subject", "ring", "class_number", "start_date", "end_date", "start_time")
+
+    subject: Union[Subject, str]
+    ring: Round
+    class_number: int
+    start_date: date
+    end_date: date
+    start_time: Optional[time]
+
+    def days(self):
+        day = self.start_date
+        while day <= self.end_date:
+            yield day
+            day += timedelta(days=1)
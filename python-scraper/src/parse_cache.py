@@ -0,0 +1,127 @@
+import gzip
+import json
+import os
+from dataclasses import asdict
+from dotenv import load_dotenv
+
+from src.http_cache import sha256_hex
+from src.pdf_processing import extract_tables, tables_to_rows
+from src.data_handling import iter_olympiad_records, record_from_json, record_to_json
+from src.metrics import metrics
+from src.models import ExtractedTable
+
+# Bump whenever extraction, normalization or parsing changes their output,
+# so entries written by an older parser are never served.
+PARSER_VERSION = 3
+
+DEFAULT_CACHE_DIR = os.path.join("files", ".parse_cache")
+DEFAULT_MAX_MB = 256
+
+
+class ParseCache:
+    """Extracted tables, rows and parsed records per bulletin, keyed by PDF hash and parser version.
+
+    Entries are gzipped JSON files, one per bulletin, holding the tables, the
+    rows and the records in their JSON Lines form. Reading an entry marks
+    it as recently used; once the directory grows past ``PARSE_CACHE_MAX_MB``
+    the least recently used entries are removed.
+    """
+
+    def __init__(self, path=None, max_bytes=None):
+        load_dotenv()
+        self.path = path or os.getenv("PARSE_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("PARSE_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, content_hash):
+        return os.path.join(self.path, f"{content_hash}-v{PARSER_VERSION}.json.gz")
+
+    def get(self, content_hash):
+        """Return ``(tables, rows, records)`` for the PDF hash, or ``None`` on a miss."""
+        entry_path = self._entry_path(content_hash)
+        try:
+            with open(entry_path, "rb") as file:
+                entry = json.loads(gzip.decompress(file.read()))
+            tables = [ExtractedTable(**values) for values in entry["tables"]]
+            rows = entry["rows"]
+            records = [record_from_json(values) for values in entry["records"]]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable parse cache entry {entry_path}: {e}")
+            return None
+
+        os.utime(entry_path)
+        return tables, rows, records
+
+    def put(self, content_hash, tables, rows, records):
+        if self.max_bytes <= 0:
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        entry_path = self._entry_path(content_hash)
+        tmp_path = f"{entry_path}.tmp"
+        with open(tmp_path, "wb") as file:
+            entry = {
+                "tables": [asdict(table) for table in tables],
+                "rows": rows,
+                "records": [record_to_json(record) for record in records],
+            }
+            file.write(gzip.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8")))
+        os.replace(tmp_path, entry_path)
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.path):
+            # Counts entries of every format, so files left by an older version are evicted too
+            if not name.endswith(".tmp"):
+                stat = os.stat(os.path.join(self.path, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.path, name))
+            total -= size
+
+    def store_when_complete(self, content_hash, tables, rows, records):
+        """Pass ``records`` through and cache them once the stream is exhausted."""
+        collected = []
+        for record in records:
+            collected.append(record)
+            yield record
+        self.put(content_hash, tables, rows, collected)
+
+
+def parse_pdf(pdf_content, cache=None):
+    """Return the bulletin tables, rows and a record stream, from ``cache`` when possible.
+
+    On a miss the PDF is extracted and parsed as usual and the result is
+    cached once the returned records have been fully consumed.
+    """
+    content_hash = sha256_hex(pdf_content)
+
+    if cache is not None:
+        cached = cache.get(content_hash)
+        if cached is not None:
+            metrics.inc("parse_cache_hits_total")
+            print(f"Parse cache hit for PDF {content_hash[:12]}, skipping extraction.")
+            tables, rows, records = cached
+            return tables, rows, iter(records)
+
+        metrics.inc("parse_cache_misses_total")
+
+    with metrics.stage("extract"):
+        tables = extract_tables(pdf_content)
+    with metrics.stage("normalize"):
+        rows = tables_to_rows(tables)
+    # Parsing runs lazily while the records are uploaded
+    records = metrics.timed_iter("parse", iter_olympiad_records(rows))
+
+    if cache is not None:
+        records = cache.store_when_complete(content_hash, tables, rows, records)
+    return tables, rows, records
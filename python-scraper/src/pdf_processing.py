@@ -1,59 +1,157 @@
-import pdfplumber
-from docx import Document
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
 from dotenv import load_dotenv
 
 from src.text_processing import convert_roman_to_arabic, expand_ranges_in_text
-from src.load_env import load_environment_variables
+from src.load_env import load_environment_variables, docx_export_enabled
+from src.models import ExtractedTable
+
+DEFAULT_PAGE_HEADERS = {
+    1: "ОБЛАСТЕН КРЪГ",  # Page 2 in the PDF (index 1)
+    2: "РЕГИОНАЛЕН КРЪГ",  # Page 3 in the PDF (index 2)
+    3: "НАЦИОНАЛЕН КРЪГ"   # Page 4 in the PDF (index 3)
+}
+
+_worker_pdf_source = None
+
+
+def load_page_headers():
+    """Map page indices to competition level headers.
+
+    ``PDF_PAGE_HEADERS`` overrides the default layout with a JSON object whose
+    keys are page indices or inclusive ranges, e.g.
+    ``{"1-2": "ОБЛАСТЕН КРЪГ", "3": "РЕГИОНАЛЕН КРЪГ"}``.
+    """
+    load_dotenv()
+    raw = os.getenv("PDF_PAGE_HEADERS")
+    if not raw:
+        return dict(DEFAULT_PAGE_HEADERS)
+
+    page_headers = {}
+    for pages, header in json.loads(raw).items():
+        start, _, end = pages.partition("-")
+        for page_index in range(int(start), int(end or start) + 1):
+            page_headers[page_index] = header
+    return dict(sorted(page_headers.items()))
+
+
+def extract_page_table(page, header):
+    tables = page.extract_tables()
+    if not tables:
+        return None
+
+    target_table = tables[0]
+
+    columns = [convert_roman_to_arabic(column) for column in target_table[0]]
+    rows = [
+        [convert_roman_to_arabic(cell).strip().replace('\n', ' ') for cell in row]
+        for row in target_table[1:]
+    ]
+    return ExtractedTable(header, columns, rows)
+
+
+def _init_extract_worker(pdf_source):
+    global _worker_pdf_source
+    _worker_pdf_source = pdf_source
+
+
+def _extract_page_in_worker(page_index, header):
+    source = _worker_pdf_source
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+
+    import pdfplumber
+
+    # Only the requested page is parsed in this worker
+    with pdfplumber.open(source, pages=[page_index + 1]) as pdf:
+        if not pdf.pages:
+            return None
+        return extract_page_table(pdf.pages[0], header)
+
+
+def extract_tables(pdf_source, page_headers=None, max_workers=None):
+    """Read the first table of every competition level page.
+
+    ``pdf_source`` is a path, the PDF bytes or a binary file-like object.
+    Pages are extracted in parallel worker processes (``EXTRACT_WORKERS``,
+    default one per page up to the CPU count) and returned in page order.
+    """
+    if page_headers is None:
+        page_headers = load_page_headers()
+    if hasattr(pdf_source, "read"):
+        pdf_source = pdf_source.read()
+    if max_workers is None:
+        load_dotenv()
+        max_workers = int(os.getenv("EXTRACT_WORKERS", 0)) or min(len(page_headers), os.cpu_count() or 1)
+
+    if max_workers <= 1 or len(page_headers) <= 1:
+        # Imported on use; pdfplumber and pdfminer take a noticeable time to load
+        import pdfplumber
+
+        tables = []
+        with pdfplumber.open(BytesIO(pdf_source) if isinstance(pdf_source, bytes) else pdf_source) as pdf:
+            for page_index, header in page_headers.items():
+                if page_index < len(pdf.pages):
+                    tables.append(extract_page_table(pdf.pages[page_index], header))
+        return [table for table in tables if table is not None]
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_extract_worker,
+        initargs=(pdf_source,),
+    ) as executor:
+        tables = executor.map(_extract_page_in_worker, page_headers.keys(), page_headers.values())
+        return [table for table in tables if table is not None]
+
+
+def tables_to_rows(tables):
+    """Flatten extracted tables into the tab-separated records the parser reads.
+
+    A competition level header becomes a single-cell row; table rows get their
+    class and date ranges expanded and are split after every cell holding a
+    date ("Г.").
+    """
+    rows = []
+
+    for table in tables:
+        rows.append([table.header])
+
+        for row in table.rows:
+            buffer = ""
+            for cell in row:
+                expanded_cell = expand_ranges_in_text(cell)
+                buffer += expanded_cell + "\t"
+
+                if "Г." in expanded_cell:
+                    rows.append(buffer.strip().split("\t"))
+                    buffer = ""
+
+            if buffer.strip():
+                rows.append(buffer.strip().split("\t"))
+
+    return rows
+
+
+def write_rows_to_txt(rows, output_txt_path):
+    with open(output_txt_path, 'w', encoding='utf-8') as txt_file:
+        for row in rows:
+            txt_file.write("\t".join(row) + '\n')
+    print(f"Text file saved successfully: {output_txt_path}")
+
 
 def pdf_to_word_and_extract_table():
     PDF_FILE_PATH, OUTPUT_WORD_PATH, OUTPUT_TXT_PATH, _ = load_environment_variables()
 
-    headers = {
-        1: "ОБЛАСТЕН КРЪГ",  # Page 2 in the PDF (index 1)
-        2: "РЕГИОНАЛЕН КРЪГ",  # Page 3 in the PDF (index 2)
-        3: "НАЦИОНАЛЕН КРЪГ"   # Page 4 in the PDF (index 3)
-    }
-
-    with pdfplumber.open(PDF_FILE_PATH) as pdf:
-        doc = Document()
-        doc.add_heading('Extracted Tables', 0)
-
-        with open(OUTPUT_TXT_PATH, 'w', encoding='utf-8') as txt_file:
-            # Loop through pages 2, 3, and 4 (indices 1, 2, 3)
-            for page_index, header in headers.items():
-                page = pdf.pages[page_index]  # Fetch the current page
-                tables = page.extract_tables()
-
-                if tables:
-                    target_table = tables[0]
-
-                    # Add header to the Word document and text file
-                    doc.add_paragraph(header)  # For Word document
-                    txt_file.write(header + '\n')  # For TXT file
-
-                    # Add the table to the Word document
-                    table_in_doc = doc.add_table(rows=1, cols=len(target_table[0]))
-                    hdr_cells = table_in_doc.rows[0].cells
-                    for i, header in enumerate(target_table[0]):
-                        hdr_cells[i].text = convert_roman_to_arabic(header)
-
-                    for row in target_table[1:]:
-                        row_cells = table_in_doc.add_row().cells
-                        buffer = ""
-                        for i, cell in enumerate(row):
-                            formatted_cell = convert_roman_to_arabic(cell).strip().replace('\n', ' ')
-                            expanded_cell = expand_ranges_in_text(formatted_cell)
-                            row_cells[i].text = formatted_cell
-                            buffer += expanded_cell + "\t"
-
-                            if "Г." in expanded_cell:
-                                txt_file.write(buffer.strip() + '\n')
-                                buffer = ""
-
-                        if buffer.strip():
-                            txt_file.write(buffer.strip() + '\n')
-
-            doc.save(OUTPUT_WORD_PATH)
-            print(f"Word document saved successfully: {OUTPUT_WORD_PATH}")
-            print(f"Text file saved successfully: {OUTPUT_TXT_PATH}")
+    tables = extract_tables(PDF_FILE_PATH)
+    rows = tables_to_rows(tables)
+
+    if docx_export_enabled():
+        from src.docx_export import export_tables_to_docx
+        export_tables_to_docx(tables, OUTPUT_WORD_PATH)
+
+    write_rows_to_txt(rows, OUTPUT_TXT_PATH)
 
+    return rows
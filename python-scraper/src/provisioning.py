@@ -0,0 +1,178 @@
+import csv
+import json
+import os
+import secrets
+
+from src.upload_engine import run_uploads
+from src.upload_journal import UploadJournal, get_upload_journal_path, idempotency_key
+
+REQUIRED_ROSTER_FIELDS = ("Name", "DateOfBirth", "Username", "Email")
+
+
+class RosterError(ValueError):
+    """Raised when a roster file cannot be read or a row misses required fields."""
+
+
+def normalize_email(email):
+    return (email or "").strip().lower()
+
+
+def load_roster(roster_path):
+    """Read the users to provision from a ``.csv`` or ``.json`` roster.
+
+    Columns (or JSON keys) are the fields of the users endpoint: ``Name``,
+    ``DateOfBirth``, ``Username``, ``Email`` and optionally ``Gender`` and
+    ``Password``. Users without a password get a random one; they set their
+    own through the password reset email. Duplicate emails keep the first row.
+    """
+    if not os.path.exists(roster_path):
+        raise RosterError(f"Roster not found: {roster_path}")
+
+    with open(roster_path, "r", encoding="utf-8-sig", newline="") as roster_file:
+        if roster_path.lower().endswith(".json"):
+            try:
+                rows = json.load(roster_file)
+            except ValueError as e:
+                raise RosterError(f"Roster {roster_path} is not valid JSON: {e}") from e
+            if not isinstance(rows, list):
+                raise RosterError(f"Roster {roster_path} must hold a JSON list of users")
+        elif roster_path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(roster_file))
+        else:
+            raise RosterError(f"Roster must be a .csv or .json file: {roster_path}")
+
+    roster = {}
+    for line, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            raise RosterError(f"Roster entry {line} in {roster_path} is not an object")
+        row = {key.strip(): (value.strip() if isinstance(value, str) else value) for key, value in row.items() if key}
+        missing = [field for field in REQUIRED_ROSTER_FIELDS if not row.get(field)]
+        if missing:
+            raise RosterError(f"Roster entry {line} in {roster_path} is missing: {', '.join(missing)}")
+
+        email = normalize_email(row["Email"])
+        if email in roster:
+            print(f"Skipping duplicate roster entry for {row['Email']}.")
+            continue
+        roster[email] = row
+
+    return list(roster.values())
+
+
+def index_users_by_email(users):
+    """Map the normalized email of every existing user to the user."""
+    return {normalize_email(user.get("email")): user for user in users if user.get("email")}
+
+
+def build_user_payload(user, academic_year):
+    return {
+        "Name": user["Name"],
+        "DateOfBirth": user["DateOfBirth"],
+        "AcademicYearId": int(academic_year),
+        "Username": user["Username"],
+        "Email": user["Email"],
+        "Password": user.get("Password") or secrets.token_urlsafe(16),
+        "Gender": user.get("Gender") or None,
+        "EmailVerified": False,
+    }
+
+
+def print_user_errors(title, errors):
+    if errors:
+        print(f"\nErrors during {title}:")
+        for err in errors:
+            print(f"User: {err['user']}, Error: {err['error']}")
+
+
+def provision_users(client, roster, endpoints, academic_year, max_workers):
+    """Create the roster users that do not exist yet and onboard them.
+
+    Existing users are matched by normalized email through one index built
+    from a single ``fetch_all_users`` call, so users already in the system
+    are left alone. New users get their role assigned and a password reset
+    email; creation and onboarding each run with at most ``max_workers``
+    requests in flight. Onboarding results are kept in the upload journal,
+    so users whose onboarding failed or never ran are onboarded on the next
+    run. Returns the emails of the users created.
+    """
+    # Imported here to avoid a circular import; backend_connection drives provisioning
+    from src.backend_connection import (
+        send_to_endpoint,
+        fetch_all_users,
+        assign_role_to_user,
+        request_password_reset_for_user,
+    )
+
+    users = fetch_all_users(client, endpoints["users_endpoint"])
+    if not isinstance(users, list):
+        print("Failed to fetch users. Cannot provision the roster.")
+        return []
+
+    journal_path = get_upload_journal_path()
+    journal = UploadJournal(journal_path) if journal_path else None
+
+    def key_of(email):
+        return idempotency_key(endpoints["role_assignment_endpoint"], [normalize_email(email)])
+
+    def onboard(user):
+        error = assign_role_to_user(client, endpoints["role_assignment_endpoint"], user["userId"])
+        if error:
+            return f"Role assignment failed: {error}"
+        return request_password_reset_for_user(client, endpoints["rpc_endpoint"], user["email"])
+
+    try:
+        existing = index_users_by_email(users)
+        missing = [user for user in roster if normalize_email(user["Email"]) not in existing]
+        print(f"\n{len(roster) - len(missing)} roster users already exist, creating {len(missing)}.")
+
+        # Users created earlier whose onboarding failed or was interrupted
+        unfinished_keys = journal.failed_keys() if journal else set()
+        unfinished = [
+            user for user in roster
+            if normalize_email(user["Email"]) in existing and key_of(user["Email"]) in unfinished_keys
+        ]
+        if not missing and not unfinished:
+            return []
+
+        if missing:
+            if journal:
+                # Recorded before creating, so a run that stops before onboarding is picked up again
+                for user in missing:
+                    journal.record(key_of(user["Email"]), "Created, not onboarded yet")
+                journal.flush()
+
+            created = run_uploads(
+                lambda payload: send_to_endpoint(client, endpoints["users_endpoint"], payload),
+                ((build_user_payload(user, academic_year), {"user": user["Name"]}) for user in missing),
+                max_workers=max_workers,
+            )
+            print_user_errors("user creation", created.errors)
+
+            users = fetch_all_users(client, endpoints["users_endpoint"])
+            if not isinstance(users, list):
+                print("Failed to fetch users. Cannot assign roles.")
+                return []
+            existing = index_users_by_email(users)
+
+        if journal:
+            onboard = journal.journaled(onboard, lambda user: key_of(user["email"]))
+
+        new_users = []
+        for user in missing + unfinished:
+            matching_user = existing.get(normalize_email(user["Email"]))
+            if matching_user:
+                new_users.append((matching_user, {"user": user["Name"]}))
+            else:
+                print(f"User {user['Name']} not found in the system.")
+
+        if unfinished:
+            print(f"Retrying the onboarding of {len(unfinished)} users from an earlier run.")
+        onboarded = run_uploads(onboard, new_users, max_workers=max_workers)
+        print_user_errors("role assignment and password reset", onboarded.errors)
+        print(f"\n{onboarded.sent} of {len(new_users)} users onboarded.")
+    finally:
+        if journal:
+            journal.close()
+
+    missing_emails = {normalize_email(user["Email"]) for user in missing}
+    return [user["email"] for user, _ in new_users if normalize_email(user["email"]) in missing_emails]
@@ -1,11 +1,12 @@
 import os
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import datetime
-from src.supabase_client import SupabaseClient
 from dotenv import load_dotenv
 from src.exceptions import EnvironmentVariableError
+from src.models import DownloadedPdf
+from src.http_cache import sha256_hex
+from src.metrics import metrics
 
 def check_required_env_vars(required_vars):
     missing_vars = [var for var in required_vars if not os.getenv(var)]
@@ -13,30 +14,57 @@ def check_required_env_vars(required_vars):
         raise EnvironmentVariableError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
 
-def download_pdf():
+def current_academic_year(current_date=None):
+    """Return ``(start_year, end_year)`` of the bulletin published for ``current_date``."""
+    current_date = current_date or datetime.datetime.now()
+    if current_date.month > 9 or (current_date.month == 9 and current_date.day >= 15):
+        start_year = current_date.year - 1
+        end_year = current_date.year
+    else:
+        start_year = current_date.year - 2
+        end_year = current_date.year - 1
+    return start_year, end_year
+
+
+def academic_year_url(base_url, start_year, end_year):
+    return f"{base_url}/ol-{start_year}-{end_year}/"
+
+
+def fetch_pdf(cache=None, start_year=None):
+    """Download the bulletin PDF of one academic year (the current one by default).
+
+    With an ``HttpCache`` both the year page and the PDF are requested with
+    If-None-Match/If-Modified-Since. Returns ``None`` when no PDF is linked
+    or when the PDF is unchanged since the cached run.
+    """
     load_dotenv()
 
     check_required_env_vars(["BASE_URL", "SUPABASE_URL", "SUPABASE_API_KEY", "SUPABASE_BUCKET_NAME"])
 
     base_url = os.getenv("BASE_URL")
 
-    current_date = datetime.datetime.now()
-    if current_date.month > 9 or (current_date.month == 9 and current_date.day >= 15):
-        start_year = current_date.year - 1
-        end_year = current_date.year
+    if start_year is None:
+        start_year, end_year = current_academic_year()
     else:
-        start_year = current_date.year - 2
-        end_year = current_date.year - 1
+        end_year = start_year + 1
 
-    url = f"{base_url}/ol-{start_year}-{end_year}/"
+    url = academic_year_url(base_url, start_year, end_year)
 
-    response = requests.get(url)
+    response = requests.get(url, headers=cache.conditional_headers(url) if cache else None)
     response.raise_for_status()
 
-    soup = BeautifulSoup(response.content, 'html.parser')
+    if cache and response.status_code == 304 and cache.get(url).get("pdf_url"):
+        pdf_url = cache.get(url)["pdf_url"]
+    else:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+
+        iframe = soup.find("iframe", class_="ead-iframe")
+        if iframe is None:
+            print("Iframe not found on the page.")
+            return None
 
-    iframe = soup.find("iframe", class_="ead-iframe")
-    if iframe is not None:
         src_link = iframe['src']
 
         src_link_full = urljoin(url, src_link)
@@ -44,31 +72,82 @@ def download_pdf():
         pdf_url = src_link_full.split('url=')[1].split('&')[0]
         pdf_url = requests.utils.unquote(pdf_url)
 
-        # Download the PDF
-        pdf_response = requests.get(pdf_url)
-        pdf_response.raise_for_status()
+        if cache:
+            cache.store(url, response, pdf_url=pdf_url)
 
-        os.makedirs("files", exist_ok=True)
+    # Download the PDF
+    pdf_response = requests.get(pdf_url, headers=cache.conditional_headers(pdf_url) if cache else None)
+    pdf_response.raise_for_status()
 
-        pdf_filename = os.path.join("files", os.path.basename(pdf_url))
-        with open(pdf_filename, 'wb') as f:
-            f.write(pdf_response.content)
+    if cache:
+        if pdf_response.status_code == 304:
+            print(f"PDF not modified since last run: {pdf_url}")
+            return None
 
-        print(f"PDF downloaded successfully: {pdf_filename}")
+        content_hash = sha256_hex(pdf_response.content)
+        if content_hash == cache.get(pdf_url).get("sha256"):
+            cache.store(pdf_url, pdf_response, sha256=content_hash)
+            print(f"PDF content unchanged since last run: {pdf_url}")
+            return None
 
-        upload_file_to_supabase(pdf_filename, start_year, end_year)
+        cache.store(pdf_url, pdf_response, sha256=content_hash)
 
-    else:
-        print("Iframe not found on the page.")
+    print(f"PDF downloaded successfully: {pdf_url}")
+
+    return DownloadedPdf(pdf_response.content, os.path.basename(pdf_url), start_year, end_year, pdf_url)
+
+
+def save_pdf(downloaded):
+    os.makedirs("files", exist_ok=True)
+
+    pdf_filename = os.path.join("files", downloaded.filename)
+    with open(pdf_filename, 'wb') as f:
+        f.write(downloaded.content)
+
+    print(f"PDF saved successfully: {pdf_filename}")
+    return pdf_filename
+
+
+def download_pdf(write_to_disk=True, cache=None, start_year=None, archive=True):
+    with metrics.stage("download"):
+        downloaded = fetch_pdf(cache, start_year)
+    if downloaded is None or not archive:
+        return downloaded
+
+    with metrics.stage("archive"):
+        if write_to_disk:
+            pdf_filename = save_pdf(downloaded)
+            upload_file_to_supabase(pdf_filename, downloaded.start_year, downloaded.end_year)
+        else:
+            upload_bytes_to_supabase(downloaded)
+
+    return downloaded
 
 
 def upload_file_to_supabase(pdf_filename, start_year, end_year):
     folder_name = f"{start_year}-{end_year}"
 
     print(f"Uploading file: {pdf_filename} to folder: {folder_name}")
+    # The supabase SDK pulls in httpx, realtime and websockets, so it is only loaded to upload
+    from src.supabase_client import SupabaseClient
+
     supabase_client = SupabaseClient()
 
     try:
         supabase_client.upload_file(pdf_filename, folder_name)
     except Exception as e:
-        print(f"Failed to upload file: {e}")
\ No newline at end of file
+        print(f"Failed to upload file: {e}")
+
+
+def upload_bytes_to_supabase(downloaded):
+    folder_name = f"{downloaded.start_year}-{downloaded.end_year}"
+
+    print(f"Uploading file: {downloaded.filename} to folder: {folder_name}")
+    from src.supabase_client import SupabaseClient
+
+    supabase_client = SupabaseClient()
+
+    try:
+        supabase_client.upload_bytes(downloaded.content, downloaded.filename, folder_name)
+    except Exception as e:
+        print(f"Failed to upload file: {e}")
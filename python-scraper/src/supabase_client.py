@@ -1,7 +1,26 @@
+import hashlib
+import json
+import mimetypes
 import os
+import threading
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_MANIFEST_PATH = os.path.join("files", ".supabase_manifest.json")
+
+# Backfill archives several years from worker threads, each with its own client
+_manifest_lock = threading.Lock()
+
+
+def file_sha256(file_obj) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file_obj.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
 class SupabaseClient:
     def __init__(self):
         load_dotenv()
@@ -9,24 +28,110 @@ class SupabaseClient:
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_API_KEY")
         self.bucket_name = os.getenv("SUPABASE_BUCKET_NAME")
+        self.manifest_path = os.getenv("SUPABASE_MANIFEST_PATH", DEFAULT_MANIFEST_PATH)
 
         if not all([self.supabase_url, self.supabase_key, self.bucket_name]):
             raise ValueError("Environment variables for Supabase configuration are missing")
 
         self.client: Client = create_client(self.supabase_url, self.supabase_key)
+        self.manifest = self._load_manifest()
 
     def upload_file(self, file_path: str, folder: str) -> None:
         if not os.path.isfile(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
+        # The file handle is passed through so the upload is streamed, not buffered
         with open(file_path, "rb") as file:
-            file_data = file.read()
+            self._upload(file, file_sha256(file), os.path.basename(file_path), folder)
 
-        response = self.client.storage.from_(self.bucket_name).upload(
-            f"{folder}/{os.path.basename(file_path)}", file_data
-        )
+    def upload_bytes(self, file_data: bytes, file_name: str, folder: str) -> None:
+        self._upload(file_data, hashlib.sha256(file_data).hexdigest(), file_name, folder)
 
-        if response.status_code == 200:
-            print(f"File uploaded successfully to folder '{folder}' in Supabase bucket '{self.bucket_name}'.")
+    def _upload(self, file_data, content_hash: str, file_name: str, folder: str) -> None:
+        object_path = f"{folder}/{file_name}"
+
+        if self._stored_hash(object_path) == content_hash:
+            print(f"File '{object_path}' is already up to date in Supabase bucket '{self.bucket_name}'. Skipping upload.")
+            self._remember(object_path, content_hash)
+            return
+
+        bucket = self.client.storage.from_(self.bucket_name)
+        existing_path = self._path_for_hash(content_hash)
+        if existing_path and self._copy(bucket, existing_path, object_path):
+            print(f"File with identical content copied from '{existing_path}' to '{object_path}'.")
         else:
-            raise RuntimeError(f"Upload failed with status code {response.status_code}. Response: {response.text}")
+            content_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+            bucket.upload(
+                object_path,
+                file_data,
+                {"content-type": content_type, "upsert": "true", "metadata": {"sha256": content_hash}},
+            )
+            print(f"File uploaded successfully to folder '{folder}' in Supabase bucket '{self.bucket_name}'.")
+
+        self._remember(object_path, content_hash)
+
+    def _copy(self, bucket, source_path: str, object_path: str) -> bool:
+        """Copy a stored object with the same content; False when the caller should upload instead."""
+        try:
+            bucket.copy(source_path, object_path)
+            return True
+        except Exception as e:
+            # copy never overwrites, so this is also how an older object at the destination shows up
+            print(f"Could not copy '{source_path}' to '{object_path}': {e}. Uploading instead.")
+
+        try:
+            bucket.info(source_path)
+        except Exception as e:
+            if _is_not_found(e):
+                self._forget(source_path)
+        return False
+
+    def _stored_hash(self, object_path: str):
+        if object_path in self.manifest:
+            return self.manifest[object_path]
+
+        # Fall back to the object's metadata when the local manifest has no entry
+        try:
+            info = self.client.storage.from_(self.bucket_name).info(object_path)
+        except Exception:
+            return None
+        return (info.get("metadata") or {}).get("sha256") if isinstance(info, dict) else None
+
+    def _path_for_hash(self, content_hash: str):
+        return next((path for path, sha in self.manifest.items() if sha == content_hash), None)
+
+    def _load_manifest(self) -> dict:
+        if not os.path.isfile(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable Supabase manifest {self.manifest_path}: {e}")
+            return {}
+
+    def _remember(self, object_path: str, content_hash: str) -> None:
+        self._update_manifest(lambda manifest: manifest.__setitem__(object_path, content_hash))
+
+    def _forget(self, object_path: str) -> None:
+        """Drop an entry whose object no longer exists, so it is not copied from again."""
+        self._update_manifest(lambda manifest: manifest.pop(object_path, None))
+
+    def _update_manifest(self, change) -> None:
+        with _manifest_lock:
+            # Start from the file, so entries written by other clients since this one loaded are kept
+            manifest = self._load_manifest()
+            change(manifest)
+            self.manifest = manifest
+
+            directory = os.path.dirname(self.manifest_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.manifest_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(manifest, file, indent=4)
+            os.replace(tmp_path, self.manifest_path)
+
+
+def _is_not_found(error: Exception) -> bool:
+    return str(getattr(error, "status", "")) == "404" or "not found" in str(error).lower()
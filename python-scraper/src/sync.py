@@ -0,0 +1,122 @@
+import os
+from dataclasses import dataclass, field
+from typing import List
+from dotenv import load_dotenv
+
+SYNC_MODES = ("post", "sync", "dry-run")
+
+# Fields that can change for an olympiad without changing its identity
+UPDATABLE_FIELDS = ("Description", "Location", "StartTime")
+
+
+@dataclass
+class SyncPlan:
+    inserts: List[tuple] = field(default_factory=list)  # (payload, olympiad)
+    updates: List[tuple] = field(default_factory=list)  # (olympiad_id, payload, olympiad)
+    deletes: List[tuple] = field(default_factory=list)  # (olympiad_id, existing payload)
+    unchanged: int = 0
+
+
+def get_sync_mode():
+    load_dotenv()
+    mode = os.getenv("OLYMPIAD_SYNC_MODE", "post").strip().lower()
+    if mode not in SYNC_MODES:
+        raise ValueError(f"Unknown OLYMPIAD_SYNC_MODE '{mode}'. Expected one of: {', '.join(SYNC_MODES)}")
+    return mode
+
+
+def deletes_enabled():
+    load_dotenv()
+    return os.getenv("OLYMPIAD_SYNC_DELETE", "").strip().lower() in ("1", "true", "yes")
+
+
+def olympiad_key(payload):
+    return (
+        payload["Subject"],
+        payload["Round"],
+        payload["DateOfOlympiad"],
+        payload["ClassNumber"],
+        payload["AcademicYearId"],
+    )
+
+
+def normalize_existing(olympiad):
+    """Turn an olympiad returned by the API into ``(olympiad_id, payload)``.
+
+    The payload has the same shape as the ones built from the bulletin, so
+    keys and updatable fields compare directly.
+    """
+    start_time = olympiad.get("startTime")
+    payload = {
+        "Subject": olympiad.get("subject"),
+        "Description": olympiad.get("description"),
+        "DateOfOlympiad": (olympiad.get("dateOfOlympiad") or "")[:10],
+        "Round": olympiad.get("round"),
+        "Location": olympiad.get("location"),
+        "StartTime": start_time[:19] if start_time else None,
+        "AcademicYearId": olympiad.get("academicYearId"),
+        "ClassNumber": olympiad.get("classNumber"),
+    }
+    return olympiad.get("olympiadId"), payload
+
+
+def index_existing(existing):
+    index = {}
+    for olympiad in existing:
+        olympiad_id, payload = normalize_existing(olympiad)
+        index.setdefault(olympiad_key(payload), []).append((olympiad_id, payload))
+    return index
+
+
+def plan_sync(desired, existing):
+    """Diff the bulletin payloads against the olympiads the API already holds.
+
+    ``desired`` yields ``(payload, olympiad)`` pairs as built by
+    ``build_olympiad_payloads``. Deletes are limited to the academic years
+    present in ``desired`` and include duplicates left behind by earlier runs.
+    """
+    index = index_existing(existing)
+    plan = SyncPlan()
+    seen = set()
+    academic_years = set()
+
+    for payload, olympiad in desired:
+        key = olympiad_key(payload)
+        if key in seen:
+            continue
+        seen.add(key)
+        academic_years.add(payload["AcademicYearId"])
+
+        matches = index.get(key)
+        if not matches:
+            plan.inserts.append((payload, olympiad))
+            continue
+
+        olympiad_id, current = matches[0]
+        if any(payload.get(name) != current.get(name) for name in UPDATABLE_FIELDS):
+            plan.updates.append((olympiad_id, payload, olympiad))
+        else:
+            plan.unchanged += 1
+
+    for key, matches in index.items():
+        if key[-1] not in academic_years:
+            continue
+        stale = matches if key not in seen else matches[1:]
+        plan.deletes.extend(stale)
+
+    return plan
+
+
+def print_sync_plan(plan, dry_run=False):
+    title = "Sync plan (dry run)" if dry_run else "Sync plan"
+    print(f"\n{title}: {len(plan.inserts)} to insert, {len(plan.updates)} to update, "
+          f"{len(plan.deletes)} to delete, {plan.unchanged} unchanged.")
+
+    for payload, _ in plan.inserts:
+        print(f"  + {payload}")
+    for olympiad_id, payload, _ in plan.updates:
+        print(f"  ~ [{olympiad_id}] {payload}")
+    for olympiad_id, payload in plan.deletes:
+        print(f"  - [{olympiad_id}] {payload}")
+    if plan.deletes:
+        print("Deleting an olympiad also deletes every student enrollment for it.")
@@ -36,14 +36,28 @@ competition_levels = {
     "НАЦИОНАЛЕН КРЪГ": "national_ring"
 }
 
+# Precompiled once at import; these run for every header and cell of a bulletin
+ROMAN_NUMERAL_PATTERN = re.compile(
+    r'\b(' + '|'.join(sorted(roman_to_arabic, key=len, reverse=True)) + r')\b'
+)
+ROMAN_NUMERAL_REPLACEMENTS = {roman: str(arabic) for roman, arabic in roman_to_arabic.items()}
+NORMALIZATION_TABLE = str.maketrans({"Х": "X", "І": "I", "–": "-"})
+
+DATE_RANGE_SPLIT_PATTERN = re.compile(r'(\d{2}\.\d{2}\s*-\s*\d{2}\.\d{2}\.\d{4})')
+DATE_RANGE_PATTERN = re.compile(r'(\d{2})\.(\d{2})\s*-\s*(\d{2})\.(\d{2})\.(\d{4})')
+LOOSE_DATE_RANGE_PATTERN = re.compile(r'(\d{2})\.?(\d{2})\s*-\s*(\d{2})\.?(\d{2})\.(\d{4})')
+DOTTED_DASH_PATTERN = re.compile(r'\.\s*-\s*')
+CLASS_RANGE_PATTERN = re.compile(r'(\d+)\s*-\s*(\d+)')
+
+
 def expand_range(start, end):
     return ' '.join(map(str, range(start, end + 1)))
 
 def is_date_range(text):
-    return bool(re.search(r'\d{2}\.?\d{2}\s*-\s*\d{2}\.?\d{2}\.\d{4}', text))
+    return LOOSE_DATE_RANGE_PATTERN.search(text) is not None
 
 def parse_date_range(date_range):
-    match = re.match(r'(\d{2})\.?(\d{2})\s*-\s*(\d{2})\.?(\d{2})\.(\d{4})', date_range)
+    match = LOOSE_DATE_RANGE_PATTERN.match(date_range)
     if match:
         day1, month1, day2, month2, year = match.groups()
         start_date = f"{day1}.{month1}.{year}"
@@ -52,7 +66,17 @@ def parse_date_range(date_range):
     return []
 
 def format_date_range(date_range):
-    return re.sub(r'\.\s*-\s*', ' - ', date_range)
+    return DOTTED_DASH_PATTERN.sub(' - ', date_range)
+
+def expand_date_range(match):
+    day1, month1, day2, month2, year = match.groups()
+    start_date = datetime(int(year), int(month1), int(day1))
+    end_date = datetime(int(year), int(month2), int(day2))
+
+    return ', '.join(
+        (start_date + timedelta(days=i)).strftime("%d.%m.%Y")
+        for i in range((end_date - start_date).days + 1)
+    )
 
 def clean_date_range(text):
     # Remove the "г." suffix
@@ -61,49 +85,38 @@ def clean_date_range(text):
     # Use format_date_range() to clean and format the date range
     formatted_text = format_date_range(text)
 
-    match = re.search(r'(\d{2})\.(\d{2})\s*-\s*(\d{2})\.(\d{2})\.(\d{4})', formatted_text)
+    match = DATE_RANGE_PATTERN.search(formatted_text)
     if match:
-        day1, month1, day2, month2, year = match.groups()
-        start_date = datetime.strptime(f"{day1}.{month1}.{year}", "%d.%m.%Y")
-        end_date = datetime.strptime(f"{day2}.{month2}.{year}", "%d.%m.%Y")
-
-        date_range = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
-
-        formatted_dates = ', '.join(date.strftime("%d.%m.%Y") for date in date_range)
-        return formatted_dates
+        return expand_date_range(match)
 
     return text
 
+def expand_class_range(match):
+    return expand_range(int(match.group(1)), int(match.group(2)))
+
 def expand_ranges_in_text(text):
     # Separate text by potential date ranges and class ranges
-    parts = re.split(r'(\d{2}\.\d{2}\s*-\s*\d{2}\.\d{2}\.\d{4})', text)
+    parts = DATE_RANGE_SPLIT_PATTERN.split(text)
     expanded_parts = []
 
-    for part in parts:
+    for index, part in enumerate(parts):
+        if index % 2:
+            # Captured by the split pattern, so it is always a full date range
+            expanded_parts.append(expand_date_range(DATE_RANGE_PATTERN.match(part)))
+            continue
+
         part = clean_date_range(part)  # Clean the date range
         if is_date_range(part):
             expanded_parts.extend(parse_date_range(part))
         else:
-            # Expand class ranges
-            pattern = re.compile(r'(\d+)\s*-\s*(\d+)')
-            expanded_part = part
-            matches = pattern.finditer(expanded_part)
-
-            for match in matches:
-                start, end = map(int, match.groups())
-                expanded_part = expanded_part.replace(match.group(0), expand_range(start, end))
-
-            expanded_parts.append(expanded_part)
+            # Expand every class range in a single pass
+            expanded_parts.append(CLASS_RANGE_PATTERN.sub(expand_class_range, part))
 
     return ''.join(expanded_parts)
 
 def normalize_text(text):
-    text = text.upper()
-    text = text.replace("Х", "X").replace("І", "I").replace("–", "-")
-    return text
+    return text.upper().translate(NORMALIZATION_TABLE)
 
 def convert_roman_to_arabic(text):
     text = normalize_text(text)
-    for roman, arabic in roman_to_arabic.items():
-        text = re.sub(rf'\b{roman}\b', str(arabic), text)
-    return text
+    return ROMAN_NUMERAL_PATTERN.sub(lambda match: ROMAN_NUMERAL_REPLACEMENTS[match.group(1)], text)
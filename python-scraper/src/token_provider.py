@@ -0,0 +1,93 @@
+import base64
+import json
+import os
+import random
+import threading
+import time
+import requests
+
+DEFAULT_REFRESH_MARGIN = 60
+DEFAULT_TOKEN_LIFETIME = 300
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 30.0
+
+
+def token_expiry(token):
+    """Return the ``exp`` claim of a JWT as a Unix timestamp, or ``None``."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+    except (IndexError, ValueError, AttributeError):
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF_BASE, cap=DEFAULT_BACKOFF_MAX):
+    """Exponential backoff with full jitter for the given zero-based attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenProvider:
+    """Cache the OlympiadApi login token and refresh it shortly before it expires.
+
+    ``get_token`` is safe to call from several threads; only one of them logs
+    in when the cached token is missing or about to expire. Failed logins are
+    retried with jittered exponential backoff.
+    """
+
+    def __init__(self, login_url, username_or_email, password, post=None):
+        self.login_url = login_url
+        self.username_or_email = username_or_email
+        self.password = password
+        self._post = post or requests.post
+
+        self.refresh_margin = float(os.getenv("TOKEN_REFRESH_MARGIN", DEFAULT_REFRESH_MARGIN))
+        self.default_lifetime = float(os.getenv("TOKEN_DEFAULT_LIFETIME", DEFAULT_TOKEN_LIFETIME))
+        self.max_attempts = int(os.getenv("AUTH_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+        self.backoff_base = float(os.getenv("AUTH_BACKOFF_BASE", DEFAULT_BACKOFF_BASE))
+        self.backoff_max = float(os.getenv("AUTH_BACKOFF_MAX", DEFAULT_BACKOFF_MAX))
+
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0.0
+
+    def get_token(self):
+        with self._lock:
+            if self._token is None or time.time() >= self._expires_at - self.refresh_margin:
+                self._token = self._login()
+                self._expires_at = token_expiry(self._token) or time.time() + self.default_lifetime
+            return self._token
+
+    def invalidate(self, token):
+        """Drop ``token`` after the API rejected it with 401.
+
+        Only a token that is still cached is dropped: when several requests
+        are rejected at once, the first caller logs in again and the others
+        reuse its new token instead of logging in one after another.
+        """
+        with self._lock:
+            if self._token == token:
+                self._token = None
+
+    def _login(self):
+        payload = {
+            "usernameOrEmail": self.username_or_email,
+            "Password": self.password
+        }
+
+        for attempt in range(self.max_attempts):
+            try:
+                response = self._post(self.login_url, json=payload)
+                response.raise_for_status()
+                token = response.json().get("token")
+                if not token:
+                    raise ValueError("Authentication failed: No token returned.")
+                return token
+            except requests.RequestException as e:
+                print(f"Authentication failed ({attempt + 1}/{self.max_attempts}): {e}")
+                if attempt + 1 < self.max_attempts:
+                    time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+
+        raise RuntimeError("Authentication failed after multiple attempts.")
@@ -0,0 +1,82 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import List
+from dotenv import load_dotenv
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_UPLOAD_LIMIT = 10
+
+
+@dataclass
+class UploadResult:
+    sent: int = 0
+    errors: List[dict] = field(default_factory=list)
+    limit_reached: bool = False
+
+    @property
+    def complete(self):
+        """True when every item was sent: nothing failed and the upload limit was not hit."""
+        return not self.errors and not self.limit_reached
+
+
+def get_upload_concurrency():
+    load_dotenv()
+    return max(1, int(os.getenv("UPLOAD_CONCURRENCY", DEFAULT_CONCURRENCY)))
+
+
+def get_upload_limit():
+    """Cap on uploaded payloads per run; ``None`` when uploads are unlimited."""
+    load_dotenv()
+    value = os.getenv("OLYMPIAD_UPLOAD_LIMIT", str(DEFAULT_UPLOAD_LIMIT)).strip().lower()
+    if value in ("", "none", "unlimited"):
+        return None
+    return int(value)
+
+
+def run_uploads(send, items, max_workers=DEFAULT_CONCURRENCY, limit=None):
+    """Send ``(payload, context)`` items with at most ``max_workers`` in flight.
+
+    ``send(payload)`` returns an error message or ``None``. The iterable is
+    consumed lazily, so uploading starts before all payloads are built.
+    Errors are returned in input order as ``{**context, "error": message}``.
+    Once ``limit`` payloads were sent successfully the remaining items are
+    left unsent.
+    """
+    result = UploadResult()
+    failures = []
+
+    def collect(future, index, context):
+        try:
+            error = future.result()
+        except Exception as e:
+            error = str(e)
+        if error:
+            failures.append((index, {**context, "error": error}))
+        else:
+            result.sent += 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for index, (payload, context) in enumerate(items):
+            # Only successful uploads count toward the limit, so a failed one frees its slot
+            while limit is not None and pending and result.sent + len(pending) >= limit:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future, *pending.pop(future))
+            if limit is not None and result.sent >= limit:
+                result.limit_reached = True
+                break
+
+            if len(pending) >= max_workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future, *pending.pop(future))
+
+            pending[executor.submit(send, payload)] = (index, context)
+
+        for future in wait(pending).done:
+            collect(future, *pending[future])
+
+    result.errors = [error for _, error in sorted(failures, key=lambda failure: failure[0])]
+    return result
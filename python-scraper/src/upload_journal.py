@@ -0,0 +1,115 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+
+DEFAULT_JOURNAL_PATH = os.path.join("files", ".upload_journal.sqlite")
+DEFAULT_BATCH_SIZE = 100
+
+
+def get_upload_journal_path():
+    """Path of the upload journal; ``None`` when journaling is disabled."""
+    load_dotenv()
+    path = os.getenv("UPLOAD_JOURNAL_PATH", DEFAULT_JOURNAL_PATH).strip()
+    if path.lower() in ("", "none", "off", "false"):
+        return None
+    return path
+
+
+def idempotency_key(scope, key):
+    """Stable text key of one write, e.g. the endpoint plus ``olympiad_key(payload)``."""
+    return json.dumps([scope, *key], ensure_ascii=False)
+
+
+class UploadJournal:
+    """SQLite journal of the writes the API has acknowledged or rejected.
+
+    Results are buffered and written ``batch_size`` at a time in a single
+    transaction, so journaling costs far less than the requests it tracks.
+    A crash loses at most one unwritten batch, whose items are simply sent
+    again on the next run. Each key keeps its latest result, so a failure
+    that succeeds on a later run is no longer retried.
+    """
+
+    def __init__(self, path=None, batch_size=None):
+        load_dotenv()
+        self.path = path or get_upload_journal_path() or DEFAULT_JOURNAL_PATH
+        self.batch_size = batch_size or int(os.getenv("UPLOAD_JOURNAL_BATCH", DEFAULT_BATCH_SIZE))
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Results arrive from the upload worker threads; the lock serializes them
+        self._lock = threading.Lock()
+        self._pending = []
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS uploads ("
+            "key TEXT PRIMARY KEY, status TEXT NOT NULL, error TEXT, recorded_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def completed_keys(self):
+        return self._keys("ok")
+
+    def failed_keys(self):
+        return self._keys("error")
+
+    def _keys(self, status):
+        with self._lock:
+            rows = self._connection.execute("SELECT key FROM uploads WHERE status = ?", (status,))
+            return {key for key, in rows}
+
+    def record(self, key, error=None):
+        with self._lock:
+            self._pending.append((key, "error" if error else "ok", error, time.time()))
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def journaled(self, send, key_of):
+        """Wrap ``send(item)`` so each result is recorded under ``key_of(item)``."""
+        def send_and_record(item):
+            try:
+                error = send(item)
+            except Exception as e:
+                error = str(e)
+            self.record(key_of(item), error)
+            return error
+
+        return send_and_record
+
+    def forget(self, keys):
+        """Drop ``keys``, e.g. of olympiads deleted from the API, so they are uploaded again."""
+        with self._lock:
+            self._flush()
+            with self._connection:
+                self._connection.executemany("DELETE FROM uploads WHERE key = ?", ((key,) for key in keys))
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO uploads (key, status, error, recorded_at) VALUES (?, ?, ?, ?)",
+                self._pending,
+            )
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()